@@ -0,0 +1,231 @@
+"""
+Headless batch analysis of recorded sessions.
+
+Runs the same measurements as main.py (blink detection, redness, pupil
+diameter, health score) over video files or image-sequence folders and writes
+one eye_health_log_*.csv per source, without a camera or a GUI window.
+
+FaceMesh and the per-frame measurements are spread across a process pool by
+file and by time segment. Workers only return per-frame measurements; the
+stateful part (BlinkDetector, health score, 5 s log cadence) is replayed in
+order over the stitched segments, so blinks that straddle a segment boundary
+are counted exactly as in a single pass.
+
+Usage:
+    python batch_analysis.py recordings/*.mp4 frames_dir/ --workers 4
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from eye_session import EyeSession
+from vision.eye_metrics import measure_eyes
+from vision.landmarks import EYE_AND_IRIS, landmarks_to_array
+from utils.logging_helpers import SessionLogger, create_timestamped_log_file, filename_tag
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp"}
+LOG_INTERVAL = 5  # seconds of source time between log rows, as in main.py
+
+# Per-frame measurement columns returned by workers; NaN where no face was found
+T, EAR, REDNESS, PUPIL = range(4)
+
+
+def list_frames(source):
+    """Sorted image paths for an image-sequence folder."""
+    return sorted(str(p) for p in Path(source).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+
+
+def probe_source(source, image_fps):
+    """
+    Frame count and rate of a video file or image-sequence folder.
+
+    Some containers (raw H.264, MJPEG, files cut off while recording) report
+    no frame count, and seeking in them by frame number isn't reliable
+    either. Their frames are counted with one grab() pass instead, and they
+    are marked as not seekable so they are analyzed as a single segment.
+
+    Returns:
+        tuple: (frame_count, fps, seekable); frame_count is 0 if the source can't be opened
+    """
+    if os.path.isdir(source):
+        return len(list_frames(source)), image_fps, True
+    cap = cv2.VideoCapture(source)
+    if not cap.isOpened():
+        return 0, image_fps, False
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not fps > 0:  # also catches NaN
+        print(f"⚠️ {source} reports no frame rate; assuming {image_fps} fps")
+        fps = image_fps
+    seekable = count > 0
+    if not seekable:
+        print(f"⚠️ {source} reports no frame count; counting frames and analyzing it as one segment")
+        count = 0
+        while cap.grab():
+            count += 1
+    cap.release()
+    return count, fps, seekable
+
+
+def recording_started_at(source, frame_count, fps):
+    """
+    Best guess at when a recording started, for the log name: the oldest
+    frame of an image folder, or a video's mtime (when writing finished)
+    minus its duration.
+    """
+    if os.path.isdir(source):
+        frames = list_frames(source)
+        if frames:
+            return datetime.fromtimestamp(min(os.path.getmtime(p) for p in frames))
+    return datetime.fromtimestamp(os.path.getmtime(source) - frame_count / fps)
+
+
+def source_tag(source):
+    """"<parent>-<stem>" of a source, so day1/session.mp4 and day2/session.mp4 get different logs."""
+    path = Path(os.path.abspath(source))
+    return filename_tag(path.parent.name, path.stem)
+
+
+def plan_segments(frame_count, fps, segment_seconds):
+    """Split [0, frame_count) into contiguous (start, end) frame ranges."""
+    step = max(int(segment_seconds * fps), 1)
+    return [(start, min(start + step, frame_count)) for start in range(0, frame_count, step)]
+
+
+def iter_frames(source, start, end):
+    if os.path.isdir(source):
+        for path in list_frames(source)[start:end]:
+            frame = cv2.imread(path)
+            if frame is not None:
+                yield frame
+        return
+    cap = cv2.VideoCapture(source)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    for _ in range(end - start):
+        success, frame = cap.read()
+        if not success:
+            break
+        yield frame
+    cap.release()
+
+
+def analyze_segment(source, start, end, fps, flip=True):
+    """
+    Worker: run FaceMesh and the per-frame measurements over one segment.
+
+    Returns:
+        np.ndarray: (frames, 4) float32 array of [t, avg_ear, redness, pupil_diameter]
+    """
+    import mediapipe as mp
+
+    face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True)
+    rows = np.full((end - start, 4), np.nan, dtype=np.float32)
+    n = -1
+    for n, frame in enumerate(iter_frames(source, start, end)):
+        if flip:
+            frame = cv2.flip(frame, 1)  # match the mirrored live view
+        rows[n, T] = (start + n) / fps
+        results = face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        if not results.multi_face_landmarks:
+            continue
+        img_h, img_w = frame.shape[:2]
+        # Nothing here tracks the face box, so only the eye and iris points are read
+        pts = landmarks_to_array(results.multi_face_landmarks[0].landmark, img_w, img_h, indices=EYE_AND_IRIS)
+        metrics = measure_eyes(frame, pts)
+        rows[n, EAR:] = metrics["avg_ear"], metrics["redness"], metrics["pupil_diameter"]
+    face_mesh.close()
+    return rows[:n + 1]
+
+
+def score_session(rows, log_filename, eye_closed_thresh=0.30):
+    """
+    Replay stitched per-frame measurements through an EyeSession (blink
+    detection, health score, LOG_INTERVAL log cadence) on source time.
+
+    Returns:
+        int: number of rows written
+    """
+    session = EyeSession(SessionLogger(log_filename, flush_rows=1000),
+                         eye_closed_thresh=eye_closed_thresh, log_interval=LOG_INTERVAL)
+    for t, avg_ear, redness, pupil_diameter in rows.tolist():
+        if np.isnan(avg_ear):
+            session.no_face(t)
+        else:
+            session.update(avg_ear, redness, pupil_diameter, timestamp=t)
+    session.close()
+    return session.rows_logged
+
+
+def run_batch(sources, workers=None, segment_seconds=300, image_fps=30.0, flip=True,
+              out_dir="data/logs", eye_closed_thresh=0.30, overwrite=False):
+    """
+    Analyze every source in parallel and write one log per source.
+
+    Returns:
+        dict: source -> path of the written log
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    plans = {}
+    log_names = set()
+    for source in sources:
+        frame_count, fps, seekable = probe_source(source, image_fps)
+        if not frame_count:
+            print(f"⚠️ Skipping {source}: no frames could be read")
+            continue
+        name = os.path.basename(create_timestamped_log_file(
+            tag=source_tag(source), started_at=recording_started_at(source, frame_count, fps)))
+        log_filename = os.path.join(out_dir, name)
+        if log_filename in log_names:
+            print(f"⚠️ Skipping {source}: another source in this run also writes {log_filename}")
+            continue
+        if os.path.exists(log_filename):
+            if not overwrite:
+                print(f"⚠️ Skipping {source}: {log_filename} exists (use --overwrite to replace it)")
+                continue
+            print(f"Replacing {log_filename}")
+            os.remove(log_filename)
+        log_names.add(log_filename)
+        segments = plan_segments(frame_count, fps, segment_seconds) if seekable else [(0, frame_count)]
+        plans[source] = (fps, segments, log_filename)
+
+    outputs = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            source: [pool.submit(analyze_segment, source, start, end, fps, flip) for start, end in segments]
+            for source, (fps, segments, _) in plans.items()
+        }
+        for source, segment_futures in futures.items():
+            # Segments come back in submission order, so concatenation restores the timeline
+            parts = [f.result() for f in segment_futures]
+            rows = np.concatenate(parts) if parts else np.empty((0, 4), dtype=np.float32)
+            log_filename = plans[source][2]
+            written = score_session(rows, log_filename, eye_closed_thresh)
+            print(f"✅ {source}: {len(rows)} frames, {written} log rows -> {log_filename}")
+            outputs[source] = log_filename
+    return outputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless eye-health analysis of recorded sessions.")
+    parser.add_argument("sources", nargs="+", help="Video files or folders of frames")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--segment-seconds", type=float, default=300,
+                        help="Split each source into segments of this length")
+    parser.add_argument("--image-fps", type=float, default=30.0, help="Frame rate assumed for image folders")
+    parser.add_argument("--no-flip", action="store_true", help="Do not mirror frames like the live view")
+    parser.add_argument("--out-dir", default="data/logs")
+    parser.add_argument("--eye-closed-thresh", type=float, default=0.30)
+    parser.add_argument("--overwrite", action="store_true", help="Replace logs left by an earlier run")
+    args = parser.parse_args()
+
+    run_batch(args.sources, args.workers, args.segment_seconds, args.image_fps,
+              not args.no_flip, args.out_dir, args.eye_closed_thresh, args.overwrite)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 import os
-import cv2
 import shutil
-import time
-import mediapipe as mp
 from pathlib import Path
 
-from recognizer.train_face_recognizer import train_eye_recognizer
-from utils.snapshot_helpers import crop_and_save_eye_snapshot
+from recognizer.enrollment import EnrollmentEngine
+from utils.log_loading import IncrementalLogReader
+from utils.downsample import downsample_series
+from utils.session_catalog import SessionCatalog
+from utils.snapshot_index import SnapshotIndex
+from utils.profiling import timings_log_path
+from utils.live_metrics import MetricsSubscriber
 
 # ------------------- PAGE CONFIG --------------------
 st.set_page_config(page_title="EYEME Dashboard", layout="centered", page_icon="😎")
@@ -36,13 +38,37 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 LOG_DIR = BASE_DIR / "data" / "logs"
 SNAPSHOT_DIR = BASE_DIR / "data" / "snapshots"
 TRAINING_DIR = BASE_DIR / "data" / "face_training"
+CATALOG_PATH = BASE_DIR / "data" / "session_catalog.sqlite"
+SNAPSHOT_INDEX_PATH = BASE_DIR / "data" / "snapshot_index.sqlite"
+THUMBNAIL_DIR = BASE_DIR / "data" / "thumbnails"
+GALLERY_PAGE_SIZE = 12
+CHART_POINTS = 600  # per-chart point budget after downsampling
+LIVE_POINTS = 3600  # backfilled history (up to 1800 points) plus about 2 min of live frames at 15 fps
 
 # ------------------- LOAD LOG FILE --------------------
-log_files = sorted(LOG_DIR.glob("eye_health_log_*.csv"))
+@st.cache_resource
+def get_log_reader(path):
+    # One reader per log path; it re-parses only when the file's size/mtime change
+    return IncrementalLogReader(path)
+
+@st.cache_data(max_entries=32)
+def chart_data(path, signature, column, _df):
+    # Keyed on path + the reader's file signature, so widget reruns reuse the downsampled
+    # series and a rewritten log with the same row count is still re-charted
+    return downsample_series(_df, "time_min", column, CHART_POINTS)
+
+# Zero-byte logs (sessions that never logged a row) have nothing to show
+log_files = sorted(f for f in list(LOG_DIR.glob("eye_health_log_*.csv")) + list(LOG_DIR.glob("eye_health_log_*.parquet"))
+                   if f.stat().st_size > 0)
 if log_files:
     selected_log = st.selectbox("📁 Select Session Log", [str(f) for f in log_files], index=len(log_files)-1)
-    df = pd.read_csv(selected_log)
-    st.success(f"Loaded: {Path(selected_log).name}")
+    log_reader = get_log_reader(selected_log)
+    df = log_reader.read()
+    if log_reader.error is not None:
+        # e.g. a Parquet log whose session is still running (no footer until it closes)
+        st.warning(f"Can't read {Path(selected_log).name} yet ({log_reader.error}); showing the last readable data.")
+    else:
+        st.success(f"Loaded: {Path(selected_log).name}")
 else:
     st.error("No logs found.")
     st.stop()
@@ -51,6 +77,8 @@ else:
 st.subheader("🔁 Face Recognizer Control")
 if st.button("Retrain Face Recognizer"):
     with st.spinner("Retraining model on eye snapshots..."):
+        # Imported on demand so ordinary reruns don't pay for the training module
+        from recognizer.train_face_recognizer import train_eye_recognizer
         success = train_eye_recognizer()
         if success:
             st.success("Model retrained successfully!")
@@ -58,65 +86,73 @@ if st.button("Retrain Face Recognizer"):
             st.error("Training failed. No data found.")
 
 # ------------------- ADD NEW USER --------------------
+def create_face_mesh():
+    # mediapipe is only imported when the first enrollment starts, on the engine's thread
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True)
+
+@st.cache_resource
+def get_enrollment_engine():
+    # One FaceMesh for every enrollment; capture and scoring run on a background thread
+    return EnrollmentEngine(create_face_mesh)
+
 st.subheader("➕ Add New User")
 new_user = st.text_input("Enter new user name")
 max_photos = 20
 num_photos = st.slider("Snapshots to capture", 1, max_photos, 3)
+enrollment = get_enrollment_engine()
+
+if new_user and st.button("Capture Snapshots for New User", disabled=enrollment.busy):
+    enrollment.start(new_user, TRAINING_DIR / new_user, num_photos)
 
-if new_user and st.button("Capture Snapshots for New User"):
-    user_dir = TRAINING_DIR / new_user
-    user_dir.mkdir(parents=True, exist_ok=True)
-    face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True)
-    cap = cv2.VideoCapture(0)
-
-    st.info("⏳ Starting in 3 seconds...")
-    time.sleep(3)
-    st.info(f"Capturing {num_photos} snapshots...")
-
-    success_count = 0
-    for i in range(num_photos):
-        ret, frame = cap.read()
-        if not ret:
-            continue
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = face_mesh.process(rgb)
-
-        if results.multi_face_landmarks:
-            landmarks = results.multi_face_landmarks[0].landmark
-            LEFT_EYE = [33, 160, 158, 133, 153, 144]
-            RIGHT_EYE = [362, 385, 387, 263, 373, 380]
-            eye_landmarks = LEFT_EYE + RIGHT_EYE
-
-            saved_path = crop_and_save_eye_snapshot(
-                frame, landmarks, eye_landmarks, str(user_dir), f"{new_user}_"
-            )
-            success_count += 1
-            st.info(f"Captured {i+1}/{num_photos}")
-            time.sleep(1)
-
-    cap.release()
-    st.success(f"✅ Saved {success_count} snapshots for '{new_user}'")
+@st.fragment(run_every=0.5 if enrollment.busy else None)
+def enrollment_progress():
+    progress = enrollment.progress
+    stage = progress["stage"]
+    if stage == "idle":
+        return
+    if stage == "capturing":
+        st.progress(progress["frames"] / progress["burst_frames"],
+                    text=f"{progress['message']} ({progress['candidates']} usable frames)")
+    elif stage in ("countdown", "selecting", "saving"):
+        st.info(f"⏳ {progress['message']}")
+    elif stage == "done":
+        st.success(f"✅ {progress['message']}")
+    else:
+        st.error(f"Enrollment failed: {progress['message']}")
+
+enrollment_progress()
 
 # ------------------- SNAPSHOT GALLERY --------------------
-st.subheader("📸 Eye Snapshot Gallery (by Person)")
-gallery = {}
-for file in sorted(SNAPSHOT_DIR.glob("*.jpg")):
-    name = file.name.split("_")[0]
-    gallery.setdefault(name, []).append(str(file))
+@st.cache_resource
+def get_snapshot_index():
+    # Persisted across reruns and restarts; thumbnails are built once in a background pool
+    return SnapshotIndex(SNAPSHOT_INDEX_PATH, THUMBNAIL_DIR,
+                         {"snapshots": (SNAPSHOT_DIR, False), "training": (TRAINING_DIR, True)})
 
-for name, files in gallery.items():
-    st.markdown(f"### 👤 {name}")
+st.subheader("📸 Eye Snapshot Gallery (by Person)")
+snapshot_index = get_snapshot_index()
+snapshot_index.refresh()  # only new or changed images are re-indexed
+gallery = dict(snapshot_index.people("snapshots"))
+if not gallery:
+    st.info("No snapshots yet.")
+else:
+    person = st.selectbox("👤 Person", list(gallery), format_func=lambda p: f"{p} ({gallery[p]})")
+    pages = -(-gallery[person] // GALLERY_PAGE_SIZE)
+    page = st.number_input("Page", 1, pages, 1, key="gallery_page") if pages > 1 else 1
     cols = st.columns(3)
-    for i, file in enumerate(files):
-        with cols[i % 3]:
-            st.image(file, caption=Path(file).name, use_container_width=True)
+    for i, image in enumerate(snapshot_index.images("snapshots", person, (page - 1) * GALLERY_PAGE_SIZE, GALLERY_PAGE_SIZE)):
+        thumb = snapshot_index.thumbnail(image["path"])
+        if thumb:
+            with cols[i % 3]:
+                st.image(thumb, caption=image["name"], use_container_width=True)
 
 # ------------------- ENROLLED USERS --------------------
 st.subheader("🧑‍🤝‍🧑 Enrolled Users")
 users = sorted([d.name for d in TRAINING_DIR.iterdir() if d.is_dir()])
+enrolled_counts = dict(snapshot_index.people("training"))
 for user in users:
-    count = len(list((TRAINING_DIR / user).glob("*.jpg")))
-    st.markdown(f"- 👁️ **{user}** ({count} images)")
+    st.markdown(f"- 👁️ **{user}** ({enrolled_counts.get(user, 0)} images)")
 
 # ------------------- DELETE / RENAME --------------------
 st.subheader("🗑 Delete a User")
@@ -134,47 +170,127 @@ if st.button("Rename User"):
     st.success(f"Renamed '{to_rename}' to '{new_name}'")
     st.rerun()
 
+# ------------------- LIVE SESSION --------------------
+@st.cache_resource
+def get_live_subscriber():
+    # One socket reader per dashboard server; it drains main.py's stream into a bounded buffer
+    return MetricsSubscriber(maxlen=LIVE_POINTS)
+
+@st.fragment(run_every=1)
+def live_view():
+    subscriber = get_live_subscriber()
+    samples = subscriber.samples()
+    if not samples:
+        st.info("Connected, waiting for a face..." if subscriber.connected
+                else "Waiting for main.py (live metrics on 127.0.0.1)...")
+        return
+    latest = samples[-1]  # backfilled history has no blink count or strain label
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Health Score", f"{latest['health_score']:.0f}")
+    col2.metric("Blink Rate", f"{latest['blink_rate']}/min")
+    col3.metric("Blinks", latest.get('blinks', "–"))
+    col4.metric("Strain", latest.get('strain_level', "–"))
+    live = pd.DataFrame(samples)
+    live["time_min"] = live["elapsed"] / 60
+    live = live.set_index("time_min")
+    st.line_chart(live[['avg_ear']])
+    st.caption("Eye Aspect Ratio (live per frame, history in 1 s means)")
+    st.line_chart(live[['blink_rate', 'health_score']])
+    st.caption("Blink Rate and Health Score (live)")
+
+st.subheader("🔴 Live Session")
+if st.toggle("Follow the running session"):
+    live_view()
+
 # ------------------- METRICS --------------------
-st.subheader("📊 Overview")
-st.metric("Total Runtime (min)", f"{df['time_min'].iloc[-1]:.1f}")
-st.metric("Avg Blink Rate", f"{df['blink_rate'].mean():.1f}")
-st.metric("Avg Redness", f"{df['redness'].mean():.3f}")
-st.metric("Avg Pupil Diameter", f"{df['pupil_diameter'].mean():.2f}")
-st.metric("Most Frequent Strain Level", df['strain_level'].mode()[0])
-
-# ------------------- SPEEDOMETER --------------------
-st.subheader("💡 Eye Health Score")
-fig = go.Figure(go.Indicator(
-    mode="gauge+number",
-    value=df['health_score'].iloc[-1],
-    title={'text': "Eye Health Score"},
-    gauge={
-        'axis': {'range': [0, 100]},
-        'bar': {'color': "white"},
-        'bgcolor': "black",
-        'borderwidth': 2,
-        'bordercolor': "white",
-        'steps': [
-            {'range': [0, 50], 'color': "#8B0000"},
-            {'range': [50, 75], 'color': "#FFD700"},
-            {'range': [75, 100], 'color': "#00FF7F"},
-        ]
-    }
-))
-st.plotly_chart(fig, use_container_width=True)
-
-# ------------------- TRENDS --------------------
-st.subheader("📈 Trends")
-st.line_chart(df.set_index("time_min")[['blink_rate']])
-st.caption("Blink Rate Over Time")
-st.line_chart(df.set_index("time_min")[['redness']])
-st.caption("Redness Over Time")
-st.line_chart(df.set_index("time_min")[['pupil_diameter']])
-st.caption("Pupil Diameter Over Time")
-st.line_chart(df.set_index("time_min")[['health_score']])
-st.caption("Health Score Over Time")
+# A session that hasn't logged a face frame yet has no rows (or columns)
+if df.empty:
+    st.info("This session has no logged rows yet.")
+else:
+    st.subheader("📊 Overview")
+    st.metric("Total Runtime (min)", f"{df['time_min'].iloc[-1]:.1f}")
+    st.metric("Avg Blink Rate", f"{df['blink_rate'].mean():.1f}")
+    st.metric("Avg Redness", f"{df['redness'].mean():.3f}")
+    st.metric("Avg Pupil Diameter", f"{df['pupil_diameter'].mean():.2f}")
+    st.metric("Most Frequent Strain Level", df['strain_level'].mode()[0])
+
+    # ------------------- SPEEDOMETER --------------------
+    st.subheader("💡 Eye Health Score")
+    fig = go.Figure(go.Indicator(
+        mode="gauge+number",
+        value=df['health_score'].iloc[-1],
+        title={'text': "Eye Health Score"},
+        gauge={
+            'axis': {'range': [0, 100]},
+            'bar': {'color': "white"},
+            'bgcolor': "black",
+            'borderwidth': 2,
+            'bordercolor': "white",
+            'steps': [
+                {'range': [0, 50], 'color': "#8B0000"},
+                {'range': [50, 75], 'color': "#FFD700"},
+                {'range': [75, 100], 'color': "#00FF7F"},
+            ]
+        }
+    ))
+    st.plotly_chart(fig, use_container_width=True)
+
+    # ------------------- TRENDS --------------------
+    st.subheader("📈 Trends")
+    st.line_chart(chart_data(selected_log, log_reader.signature, 'blink_rate', df))
+    st.caption("Blink Rate Over Time")
+    st.line_chart(chart_data(selected_log, log_reader.signature, 'redness', df))
+    st.caption("Redness Over Time")
+    st.line_chart(chart_data(selected_log, log_reader.signature, 'pupil_diameter', df))
+    st.caption("Pupil Diameter Over Time")
+    st.line_chart(chart_data(selected_log, log_reader.signature, 'health_score', df))
+    st.caption("Health Score Over Time")
+
+# ------------------- STAGE TIMINGS --------------------
+timing_log = Path(timings_log_path(selected_log))
+if timing_log.exists():
+    st.subheader("⏱ Stage Timings")
+    timings = get_log_reader(str(timing_log)).read()
+    if not timings.empty:
+        latest = timings[timings["time_min"] == timings["time_min"].max()]
+        st.dataframe(latest.set_index("stage")[['p50_ms', 'p95_ms', 'p99_ms', 'samples']].sort_values("p95_ms", ascending=False))
+        st.caption(f"Rolling percentiles at {latest['time_min'].iloc[0]:.1f} min")
+        st.line_chart(timings.pivot_table(index="time_min", columns="stage", values="p95_ms"))
+        st.caption("p95 per Stage Over Time (ms)")
+
+# ------------------- MULTI-SESSION TRENDS --------------------
+@st.cache_resource
+def get_session_catalog():
+    return SessionCatalog(CATALOG_PATH, LOG_DIR)
+
+st.subheader("🗓 Multi-Session Trends")
+catalog = get_session_catalog()
+catalog.refresh()  # only new or growing logs are re-read
+daily = pd.DataFrame(catalog.daily())
+if daily.empty:
+    st.info("No sessions in the catalog yet.")
+else:
+    period = st.radio("Group by", ["Day", "Week"], horizontal=True)
+    rollup = daily if period == "Day" else pd.DataFrame(catalog.weekly())
+    rollup = rollup.set_index("period")
+    st.line_chart(rollup[['avg_health_score']])
+    st.caption(f"Avg Health Score per {period}")
+    st.line_chart(rollup[['avg_blink_rate']])
+    st.caption(f"Avg Blink Rate per {period}")
+    st.bar_chart(rollup[['strain_low', 'strain_moderate', 'strain_high']])
+    st.caption(f"Strain Distribution per {period} (logged samples)")
+    st.dataframe(rollup[['sessions', 'duration_min', 'avg_blink_rate', 'avg_redness',
+                         'avg_pupil_diameter', 'avg_health_score']])
+
+    # One row per session; the parts of a log split on a user change are combined
+    days = daily["period"].tolist()
+    since = st.selectbox("Sessions since", days, index=max(len(days) - 7, 0))
+    sessions = pd.DataFrame(catalog.sessions(since=since)).set_index("session")
+    st.dataframe(sessions[['started_at', 'parts', 'duration_min', 'avg_blink_rate', 'avg_redness',
+                           'avg_health_score', 'final_health_score']])
+    st.caption(f"Sessions since {since}")
 
 # ------------------- EXPORT --------------------
-st.subheader("📂 Export CSV")
+st.subheader("📂 Export Log")
 with open(selected_log, "rb") as f:
-    st.download_button("Download CSV", f, file_name=Path(selected_log).name)
+    st.download_button("Download Log", f, file_name=Path(selected_log).name)
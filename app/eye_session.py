@@ -0,0 +1,223 @@
+"""
+State of one eye-health monitoring session.
+
+Everything that used to live in main.py's module globals (the blink
+detector, start time, log cadence, identification status and the session
+log) is kept on an EyeSession, so one process can run several sessions
+and batch replays use exactly the live logic.
+
+Only blink detection needs every frame. Redness, pupil diameter and the
+health score run at their own cadence (see utils.scheduler), and logged
+rows carry the mean, min and max of each sampled metric over the log
+window instead of whatever the last frame happened to measure.
+"""
+import time
+
+from vision.blink_detection import BlinkDetector
+from vision.eye_metrics import EYE_METRICS, measure_eyes
+from vision.health_score import compute_eye_health_score
+from vision.landmarks import LEFT_EYE, RIGHT_EYE
+from recognizer.eye_identifier import IdentityTracker
+from utils.profiling import NULL_PROFILER
+from utils.scheduler import LOG, MetricScheduler, WindowStats
+from utils.snapshot_helpers import crop_eye_region
+
+LOG_INTERVAL = 5  # seconds between log rows
+REDNESS_HIGH = 0.05  # redness label cutoff and start of the score penalty
+# How often each metric is computed: FRAME, LOG (log ticks only) or Hz.
+# Sampled metrics are also measured on every log tick.
+CADENCES = {
+    "redness": 5.0,
+    "pupil_diameter": 10.0,
+    "health_score": 2.0,
+    "identify": 0.2,  # eye crops handed to the identifier
+}
+
+
+class EyeSession:
+    """
+    One monitored person on one source.
+
+    Parameters:
+        session_logger (SessionLogger): Receives a row every `log_interval` seconds; closed by close()
+        eye_closed_thresh (float): EAR below which the eye counts as closed
+        redness_threshold (float): Redness above which the eye is labelled HIGH and the score drops
+        identifier (EyeIdentificationWorker): Optional; gets an eye crop at the "identify" cadence.
+            Results are smoothed by an IdentityTracker, and when the identity changes
+            the session log is split into a new file tagged with the new user
+        profiler (StageProfiler): Receives "blink", "score" and "logging" timings
+            (plus the measure_eyes stages when using process())
+        clock (callable): Timestamp source when none is passed in (seconds)
+        cadences (dict): Per-metric cadence overriding CADENCES (see utils.scheduler)
+        history (TimeSeriesStore): Optional; every frame with a face is recorded in it,
+            for the overlay, live viewers and anything else that wants windowed values
+    """
+
+    def __init__(self, session_logger, eye_closed_thresh=0.30, log_interval=LOG_INTERVAL,
+                 identifier=None, profiler=NULL_PROFILER, clock=time.monotonic, redness_threshold=REDNESS_HIGH,
+                 cadences=None, history=None):
+        self.session_logger = session_logger
+        self.blink_detector = BlinkDetector(eye_closed_thresh=eye_closed_thresh, clock=clock)
+        self.redness_threshold = redness_threshold
+        self.log_interval = log_interval
+        self.identifier = identifier
+        self.profiler = profiler
+        self.clock = clock
+        self.history = history
+
+        self.scheduler = MetricScheduler(dict(CADENCES, **(cadences or {})), log_interval)
+        self.window = {name: WindowStats() for name in EYE_METRICS}
+        self.last_sample = dict.fromkeys(EYE_METRICS)
+        self.score = None  # (health_score, strain_level) as of the last scoring
+
+        self.start_time = None
+        self.identity = IdentityTracker(threshold=identifier.threshold) if identifier else None
+        self.snapshot_saved = False
+        self.user_name = None
+        self.frames = 0
+        self.face_frames = 0
+        self.rows_logged = 0
+        self.latest = None  # values from the most recent frame with a face
+
+    def process(self, frame, pts, timestamp=None):
+        """
+        Measure and score one frame.
+
+        Parameters:
+            frame (np.ndarray): BGR frame
+            pts (np.ndarray | None): (478, 2) pixel-space landmarks, None if no face
+            timestamp (float): Frame time in seconds (default: clock())
+
+        Returns:
+            dict | None: Overlay/summary values (see update()), None if no face
+        """
+        if pts is None:
+            self.no_face(timestamp)
+            return None
+        timestamp = self.clock() if timestamp is None else timestamp
+        due = self.scheduler.due(timestamp)
+        wanted = EYE_METRICS if LOG in due else [name for name in EYE_METRICS if name in due]
+        metrics = measure_eyes(frame, pts, self.profiler, wanted)
+        self._identify(frame, pts, due)
+        return self.update(metrics["avg_ear"], metrics.get("redness"), metrics.get("pupil_diameter"),
+                           timestamp, due=due)
+
+    def update(self, avg_ear, redness=None, pupil_diameter=None, timestamp=None, due=None):
+        """
+        Feed one frame's measurements through the blink detector, the health
+        score and the log cadence.
+
+        Redness and pupil diameter are only taken on frames where they are
+        due (or on a log tick) and may be None elsewhere; the overlay shows
+        the last sample. Callers that measure every frame (batch analysis,
+        replay) are thus sampled exactly like the live loop, so a replay
+        reproduces the live log. `due` is the scheduler's answer for this
+        frame if the caller already asked for it (process() does); otherwise
+        it is asked here.
+
+        Returns:
+            dict: blinks, blink_rate, redness, redness_label, pupil_diameter,
+                strain_level, health_score, avg_ear, user_name, elapsed
+        """
+        timestamp = self.clock() if timestamp is None else timestamp
+        if due is None:
+            due = self.scheduler.due(timestamp)
+        self._tick(timestamp)
+        self.face_frames += 1
+        elapsed = timestamp - self.start_time
+        log_tick = LOG in due
+        for name, value in (("redness", redness), ("pupil_diameter", pupil_diameter)):
+            if value is not None and (log_tick or name in due):
+                value = float(value)
+                self.window[name].add(value)
+                self.last_sample[name] = value
+
+        with self.profiler.stage("blink"):
+            self.blink_detector.update(avg_ear, timestamp=timestamp)
+            blink_counts = self.blink_detector.get_blink_counts(timestamp)
+            blink_rate = blink_counts[60]
+
+        if self.score is None or log_tick or "health_score" in due:
+            with self.profiler.stage("score"):
+                # Scored on the window's mean redness so one noisy sample can't swing it
+                window_redness = self.window["redness"].mean
+                self.score = compute_eye_health_score(
+                    blink_rate, self._value("redness", window_redness), self.blink_detector.blink_log, elapsed,
+                    recent_blink_count=blink_counts[300], redness_threshold=self.redness_threshold)
+        health_score, strain_level = self.score
+
+        if log_tick:
+            with self.profiler.stage("logging"):
+                row = {"time_min": elapsed / 60, "blink_rate": blink_rate}
+                for name in EYE_METRICS:
+                    row.update(self._window_columns(name))
+                row.update(health_score=health_score, strain_level=strain_level)
+                self.session_logger.log(row)
+            for stats in self.window.values():
+                stats.reset()
+            self.rows_logged += 1
+
+        redness = self._value("redness")
+        self.latest = {
+            "blinks": self.blink_detector.blink_counter,
+            "blink_rate": blink_rate,
+            "redness": redness,
+            "redness_label": "HIGH" if redness > self.redness_threshold else "NORMAL",
+            "pupil_diameter": self._value("pupil_diameter"),
+            "strain_level": strain_level,
+            "health_score": health_score,
+            "avg_ear": float(avg_ear),
+            "user_name": self.user_name,
+            "elapsed": elapsed,
+        }
+        if self.history is not None:
+            self.history.add(elapsed, self.latest)
+        return self.latest
+
+    def _value(self, name, value=None):
+        # Fall back to the last sample, or 0.0 before the first one
+        if value is None:
+            value = self.last_sample[name]
+        return 0.0 if value is None else value
+
+    def _window_columns(self, name):
+        # Every row has the same columns, even if nothing was sampled this window
+        columns = self.window[name].summary(name)
+        if not columns:
+            value = self._value(name)
+            columns = {name: value, f"{name}_min": value, f"{name}_max": value}
+        return columns
+
+    def no_face(self, timestamp=None):
+        """Count a frame without a face; the session clock still starts on it."""
+        self._tick(self.clock() if timestamp is None else timestamp)
+
+    def _tick(self, timestamp):
+        if self.start_time is None:
+            self.start_time = timestamp
+        self.frames += 1
+
+    def _identify(self, frame, pts, due):
+        if self.identifier is None:
+            return
+        if "identify" in due:
+            # Only the first crop the worker accepts is kept as a snapshot
+            crop = crop_eye_region(frame, pts, LEFT_EYE + RIGHT_EYE)
+            if self.identifier.submit(crop, save_snapshot=not self.snapshot_saved):
+                self.snapshot_saved = True
+        identification = self.identifier.poll()
+        if identification and self.identity.add(*identification):
+            previous, self.user_name = self.user_name, self.identity.identity
+            if previous is not None:
+                self.session_logger.split(self.user_name)
+
+    def summary(self):
+        """Counters plus the latest values, for reporting to a supervisor."""
+        summary = {"frames": self.frames, "face_frames": self.face_frames,
+                   "rows_logged": self.rows_logged, "log": self.session_logger.filename}
+        if self.latest is not None:
+            summary.update(self.latest)
+        return summary
+
+    def close(self):
+        self.session_logger.close()
@@ -1,121 +1,180 @@
-import cv2
 import time
+STARTED = time.perf_counter()  # the startup report counts from here, before the heavy imports
+
+import argparse
 import os
-from datetime import datetime
-import mediapipe as mp
+import signal
+import threading
+import cv2
 
-from vision.blink_detection import BlinkDetector
-from vision.redness_detection import calc_redness
-from vision.pupil_dilation import calculate_pupil_diameter
-from vision.health_score import compute_eye_health_score
+from eye_session import EyeSession
+from vision.face_tracker import TrackedFaceMesh
 
-from recognizer.eye_identifier import identify_eye_snapshot
-from utils.logging_helpers import log_data, create_timestamped_log_file, ensure_logs_folder
-from utils.snapshot_helpers import crop_and_save_eye_snapshot
+from recognizer.eye_identifier import EyeIdentificationWorker
+from utils.landmark_recording import LandmarkRecorder
+from utils.live_metrics import DEFAULT_PORT, MetricsPublisher, history_samples, live_sample
+from utils.logging_helpers import SessionLogger, create_timestamped_log_file, ensure_logs_folder
+from utils.pipeline import FramePipeline, is_live_source, open_capture
+from utils.overlay import TextPanelLayer, draw_landmarks, draw_timings
+from utils.profiling import StageProfiler, StartupTimer, timings_log_path
+from utils.timeseries import TimeSeriesStore
+
+startup = StartupTimer(STARTED)
+startup.mark("imports")
 
 # ========== Setup ==========
+# --headless skips all drawing and windowing (e.g. on the glasses) and
+# stops on SIGINT/SIGTERM instead of ESC
+parser = argparse.ArgumentParser(description="Smart Eye Health Tracker")
+parser.add_argument("--headless", action="store_true", help="Run without a preview window or overlay")
+parser.add_argument("--source", default="0", help="Camera index or stream URL")
+parser.add_argument("--live-port", type=int, default=DEFAULT_PORT,
+                    help="Publish live metrics as NDJSON on 127.0.0.1:PORT (0 disables)")
+parser.add_argument("--record", action="store_true", help="Record landmarks to data/recordings for replay.py")
+parser.add_argument("--record-rois", action="store_true", help="With --record, also keep left-eye crops")
+args = parser.parse_args()
+# The live pipeline drops frames it can't keep up with and scores on the wall
+# clock; recordings need every frame on their own timeline
+if not is_live_source(args.source):
+    parser.error(f"{args.source} is a recording; analyze it with batch_analysis.py or multi_source.py")
+HEADLESS = args.headless
+
+stop_requested = threading.Event()
+def request_stop(signum, _frame):
+    print(f"Received signal {signum}, stopping...")
+    stop_requested.set()
+signal.signal(signal.SIGINT, request_stop)
+signal.signal(signal.SIGTERM, request_stop)
+
+# Per-stage timings: PROFILE_STAGES records them (near-zero cost when off),
+# SHOW_TIMINGS draws p50/p95/p99 on the overlay, and every
+# TIMING_LOG_INTERVAL seconds they go to a side log next to the session CSV.
+PROFILE_STAGES = True
+SHOW_TIMINGS = False
+TIMING_LOG_INTERVAL = 30
+profiler = StageProfiler(enabled=PROFILE_STAGES)
+
 ensure_logs_folder()
 log_filename = create_timestamped_log_file()
-today = datetime.now().strftime("%Y-%m-%d")
-eye_image_saved = False
-os.makedirs("data/snapshots", exist_ok=True)
-
-# Mediapipe face mesh
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True)
-
-# Facial landmark indices
-LEFT_EYE = [33, 160, 158, 133, 153, 144]
-RIGHT_EYE = [362, 385, 387, 263, 373, 380]
-LEFT_IRIS = [468, 469, 470, 471, 472]
-
-# Trackers
-blink_detector = BlinkDetector(eye_closed_thresh=0.30)
-timestamps, blink_rates = [], []
-start_time, last_log_time = time.time(), 0
+# Rows are buffered and written from a background thread, so a short
+# LOG_INTERVAL (even 0 for per-frame rows) does not stall the loop.
+LOG_INTERVAL = 5
+timing_logger = SessionLogger(timings_log_path(log_filename)) if PROFILE_STAGES else None
+# Identification and the snapshot write run on a worker thread. The session
+# re-identifies every few seconds and starts a new log file when the wearer changes.
+identifier = EyeIdentificationWorker(threshold=70, snapshot_dir="data/snapshots")
+
+# Mediapipe face mesh, run on the full frame only on keyframes.
+# TRACKING_MODE: "roi" (mesh on a crop around the last face), "flow"
+# (optical flow on eye/iris landmarks) or "full" (every frame, no tracking)
+TRACKING_MODE = "roi"
+TARGET_FPS = 15
+def create_face_mesh():
+    # mediapipe is imported here, on the loader thread, so it overlaps opening the camera
+    import mediapipe as mp
+    return mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True)
+face_mesh = TrackedFaceMesh(create_face_mesh, mode=TRACKING_MODE, target_fps=TARGET_FPS, profiler=profiler)
+
+# Live metric history at several resolutions; its memory is fixed up front,
+# so an all-day session on the glasses doesn't keep growing. The session
+# records into it, the overlay reads smoothed values from it, and a dashboard
+# that connects mid-session is first sent the last BACKFILL_SECONDS of it.
+history = TimeSeriesStore()
+BACKFILL_SECONDS = 1800
+
+# Blink detector, health score, log cadence and identification for this session
+session = EyeSession(SessionLogger(log_filename), eye_closed_thresh=0.30, log_interval=LOG_INTERVAL,
+                     identifier=identifier, profiler=profiler, history=history)
+# Per-frame landmarks and measurements for replay.py parameter sweeps
+recorder = None
+if args.record:
+    recording_dir = os.path.join("data/recordings", os.path.splitext(os.path.basename(log_filename))[0])
+    recorder = LandmarkRecorder(recording_dir, rois=args.record_rois)
+# Live samples for the dashboard; a slow or absent viewer never blocks this loop
+publisher = None
+if args.live_port:
+    try:
+        publisher = MetricsPublisher(port=args.live_port, backfill=True).start()
+    except OSError as e:
+        print(f"⚠️ Live metrics disabled: {e}")
+text_panel = TextPanelLayer(history=history)
+start_time = time.time()
+last_report_time = last_timing_log_time = time.time()
 
 # ========== Utility ==========
-def euclidean(p1, p2):
-    return ((p1.x - p2.x)**2 + (p1.y - p2.y)**2)**0.5
-
-def draw_eye_outline(frame, landmarks, eye_indices, img_w, img_h, color=(0, 255, 255)):
-    points = [(int(landmarks[i].x * img_w), int(landmarks[i].y * img_h)) for i in eye_indices]
-    for i in range(len(points)):
-        cv2.line(frame, points[i], points[(i + 1) % len(points)], color, 1)
+def run_face_mesh(packet):
+    # Inference stage: runs on its own thread so the camera never waits on the mesh
+    # Landmarks come back as one (478, 2) pixel-space array per frame
+    packet.landmarks = face_mesh.process(packet.frame)
+    return packet
 
 # ========== Main Loop ==========
-cap = cv2.VideoCapture(0)
-
-while cap.isOpened():
-    success, frame = cap.read()
-    if not success:
-        break
-
-    frame = cv2.flip(frame, 1)
-    img_h, img_w = frame.shape[:2]
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    results = face_mesh.process(rgb)
-
-    if results.multi_face_landmarks:
-        landmarks = results.multi_face_landmarks[0].landmark
-
-        left_ear = blink_detector.calculate_ear(landmarks, LEFT_EYE)
-        right_ear = blink_detector.calculate_ear(landmarks, RIGHT_EYE)
-        avg_ear = (left_ear + right_ear) / 2
-        blink_detector.update(avg_ear)
-        current_blink_rate = blink_detector.get_blink_rate(window=60)
-
-        elapsed_min = (time.time() - start_time) / 60
-        timestamps.append(elapsed_min)
-        blink_rates.append(current_blink_rate)
-
-        left_eye_pts = [(int(landmarks[p].x * img_w), int(landmarks[p].y * img_h)) for p in LEFT_EYE]
-        redness = calc_redness(frame, left_eye_pts)
-        redness_label = "HIGH" if redness > 0.05 else "NORMAL"
-        pupil_diameter = calculate_pupil_diameter(landmarks, LEFT_IRIS, euclidean)
-        health_score, strain_level = compute_eye_health_score(current_blink_rate, redness, blink_detector.blink_log, time.time() - start_time)
-
-        if not eye_image_saved:
-            eye_landmarks = LEFT_EYE + RIGHT_EYE
-            temp_path = crop_and_save_eye_snapshot(frame, landmarks, eye_landmarks, "data/snapshots", filename_prefix="temp_")
-
-            name = identify_eye_snapshot(temp_path, threshold=70)
-            cv2.putText(frame, f"User: {name}", (20, 230), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 255), 2)
-            final_path = f"data/snapshots/{name}_{today}.jpg"
-            os.rename(temp_path, final_path)
-            eye_image_saved = True
-
-        if time.time() - last_log_time >= 5:
-            log_data(log_filename, {
-                "time_min": elapsed_min,
-                "blink_rate": current_blink_rate,
-                "redness": redness,
-                "pupil_diameter": pupil_diameter,
-                "health_score": health_score,
-                "strain_level": strain_level
-            })
-            last_log_time = time.time()
-
-        for idx in LEFT_EYE + RIGHT_EYE + LEFT_IRIS:
-            pt = landmarks[idx]
-            x, y = int(pt.x * img_w), int(pt.y * img_h)
-            cv2.circle(frame, (x, y), 2, (255, 255, 0), -1)
-
-        draw_eye_outline(frame, landmarks, LEFT_EYE, img_w, img_h)
-        draw_eye_outline(frame, landmarks, RIGHT_EYE, img_w, img_h)
-
-        # Overlay text
-        cv2.putText(frame, f"Blinks: {blink_detector.blink_counter}", (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
-        cv2.putText(frame, f"Blink Rate: {current_blink_rate:.1f}/min", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
-        cv2.putText(frame, f"Redness: {redness_label}", (20, 90), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255) if redness_label == "HIGH" else (0, 255, 255), 2)
-        cv2.putText(frame, f"Pupil Diam.: {pupil_diameter:.2f}", (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 0, 255), 2)
-        cv2.putText(frame, f"Strain: {strain_level}", (20, 140), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 200, 200), 2)
-        cv2.putText(frame, f"Eye Health: {health_score}/100", (20, 170), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 0), 2)
-        cv2.putText(frame, f"EAR: {avg_ear:.3f}", (20, 200), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 255), 2)
-
-    cv2.imshow("Smart Eye Health Tracker", frame)
-    if cv2.waitKey(5) & 0xFF == 27:
+threading.Thread(target=face_mesh.load, name="face-mesh-load", daemon=True).start()
+cap = open_capture(args.source)
+startup.mark("capture open")
+pipeline = FramePipeline(cap, run_face_mesh, profiler=profiler).start()
+
+while pipeline.running and not stop_requested.is_set():
+    packet = pipeline.next_packet()
+    if packet is None:
+        continue
+
+    frame = packet.frame
+    startup.mark("first frame")
+    now = session.clock()
+    values = session.process(frame, packet.landmarks, now)
+    if recorder:
+        with profiler.stage("recording"):
+            recorder.add(now, packet.landmarks, values, frame)
+
+    if values is not None:
+        if "first metric" not in startup.marks:
+            startup.mark("first metric")
+            startup.record("face mesh load", face_mesh.load_seconds)
+            startup.record("recognizer load", identifier.load_seconds)
+            print(startup.report())
+        if publisher:
+            if publisher.backfill_pending:
+                publisher.backfill(history_samples(history, BACKFILL_SECONDS))
+            publisher.publish(live_sample(values))
+
+        if not HEADLESS:
+            with profiler.stage("drawing"):
+                draw_landmarks(frame, packet.landmarks)
+                # Only the lines whose text changed are re-rendered
+                text_panel.draw(frame, values)
+
+    if not HEADLESS:
+        if SHOW_TIMINGS:
+            draw_timings(frame, profiler.overlay_lines())
+        with profiler.stage("display"):
+            cv2.imshow("Smart Eye Health Tracker", frame)
+    pipeline.frame_done(packet)
+
+    if timing_logger and time.time() - last_timing_log_time >= TIMING_LOG_INTERVAL:
+        for row in profiler.log_rows((time.time() - start_time) / 60):
+            timing_logger.log(row)
+        last_timing_log_time = time.time()
+
+    if time.time() - last_report_time >= 5:
+        print(f"{pipeline.report()} | mesh={face_mesh.last_kind} keyframe_every={face_mesh.keyframe_interval}")
+        last_report_time = time.time()
+
+    if not HEADLESS and cv2.waitKey(1) & 0xFF == 27:
         break
 
+pipeline.stop()
+face_mesh.close()
+session.close()
+if recorder:
+    recorder.close()
+if publisher:
+    publisher.close()
+if timing_logger:
+    timing_logger.close()
+identifier.close()
 cap.release()
-cv2.destroyAllWindows()
+if not HEADLESS:
+    cv2.destroyAllWindows()
+# A failed capture or FaceMesh thread ends the loop above; surface it here
+pipeline.raise_error()
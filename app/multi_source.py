@@ -0,0 +1,226 @@
+"""
+Run several cameras or streams at once, one worker process per source.
+
+Each source (a camera index, a video file or a stream URL that OpenCV can
+open, e.g. an RTSP relay of a pair of glasses) gets its own process with
+its own FaceMesh, EyeSession and session log, so N sources use N cores.
+Workers send a summary back every few seconds and the supervisor prints
+per-source and aggregated fleet health.
+
+Usage:
+    python multi_source.py 0 recordings/anna.mp4 rtsp://127.0.0.1:8554/glasses2
+"""
+import argparse
+import multiprocessing as mp
+import os
+import queue
+import signal
+import time
+from pathlib import Path
+
+import cv2
+
+from eye_session import EyeSession
+from vision.face_tracker import TrackedFaceMesh
+from utils.logging_helpers import SessionLogger, create_timestamped_log_file, ensure_logs_folder, filename_tag
+from utils.pipeline import is_live_source, open_capture
+
+REPORT_INTERVAL = 5  # seconds between worker summaries
+
+
+def source_tag(source, index):
+    """
+    Filename-safe label for a source, unique within one run: its position
+    plus cam<N>, <host>-<stream path> or <parent>-<file stem>.
+    """
+    source = str(source)
+    if source.isdigit():
+        return filename_tag(index, f"cam{source}")
+    if "://" in source:
+        location = source.split("://", 1)[1]
+        host, _, path = location.partition("/")
+        return filename_tag(index, host, Path(path).stem)
+    path = Path(os.path.abspath(source))
+    return filename_tag(index, path.parent.name, path.stem)
+
+
+def run_source(source, index, reports, stop_event, options):
+    """
+    Worker process: capture, FaceMesh and an EyeSession for one source.
+    Puts summary dicts on `reports`; the last one has "done" set.
+    """
+    tag = source_tag(source, index)
+    summary = {"index": index, "source": str(source), "tag": tag}
+    # Workers handle shutdown through stop_event; ignore the terminal's Ctrl+C
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        import mediapipe
+
+        cap = open_capture(source)
+        if not cap.isOpened():
+            raise RuntimeError(f"Could not open {source}")
+        live = is_live_source(source)
+        face_mesh = TrackedFaceMesh(
+            lambda: mediapipe.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True),
+            mode=options["tracking_mode"], target_fps=options["target_fps"])
+        session = EyeSession(SessionLogger(create_timestamped_log_file(tag=tag)),
+                             eye_closed_thresh=options["eye_closed_thresh"])
+        started = last_report = time.monotonic()
+        try:
+            while not stop_event.is_set():
+                success, frame = cap.read()
+                if not success:
+                    break
+                if options["flip"]:
+                    frame = cv2.flip(frame, 1)
+                # Files are scored on their own timeline, live sources on the session clock
+                timestamp = None if live else cap.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                session.process(frame, face_mesh.process(frame), timestamp)
+
+                now = time.monotonic()
+                if now - last_report >= options["report_interval"]:
+                    reports.put(dict(summary, **session.summary(), fps=session.frames / (now - started)))
+                    last_report = now
+            summary.update(session.summary(), fps=session.frames / max(time.monotonic() - started, 1e-9))
+        finally:
+            session.close()
+            face_mesh.close()
+            cap.release()
+    except Exception as e:
+        summary["error"] = str(e)
+    reports.put(dict(summary, done=True))
+
+
+def aggregate(summaries):
+    """
+    Fleet-wide view of the latest summary from every source.
+
+    Returns:
+        dict: sources, active, frames, fps, blinks, mean/min health score and strain counts
+    """
+    scored = [s for s in summaries if "health_score" in s]
+    strain_counts = {}
+    for s in scored:
+        strain_counts[s["strain_level"]] = strain_counts.get(s["strain_level"], 0) + 1
+    return {
+        "sources": len(summaries),
+        "active": sum(1 for s in summaries if not s.get("done")),
+        "frames": sum(s.get("frames", 0) for s in summaries),
+        "fps": sum(s.get("fps", 0.0) for s in summaries if not s.get("done")),
+        "blinks": sum(s.get("blinks", 0) for s in scored),
+        "mean_health_score": sum(s["health_score"] for s in scored) / len(scored) if scored else None,
+        "min_health_score": min((s["health_score"] for s in scored), default=None),
+        "strain_counts": strain_counts,
+    }
+
+
+class SourceSupervisor:
+    """
+    Starts one worker process per source and collects their summaries.
+
+    Parameters:
+        sources (list): Camera indices, video files or stream URLs
+        tracking_mode (str): TrackedFaceMesh mode for every worker
+    """
+
+    def __init__(self, sources, tracking_mode="roi", target_fps=15.0, flip=True,
+                 eye_closed_thresh=0.30, report_interval=REPORT_INTERVAL):
+        self.sources = [str(s) for s in sources]
+        self.options = {"tracking_mode": tracking_mode, "target_fps": target_fps, "flip": flip,
+                        "eye_closed_thresh": eye_closed_thresh, "report_interval": report_interval}
+        # spawn: workers must not inherit the parent's threads or a half-initialized mediapipe
+        self._context = mp.get_context("spawn")
+        self._reports = self._context.Queue()
+        self._stop_event = self._context.Event()
+        self._processes = []
+        # Keyed by position: the same source may be listed twice
+        self.latest = {i: {"index": i, "source": s, "tag": source_tag(s, i)} for i, s in enumerate(self.sources)}
+
+    def start(self):
+        ensure_logs_folder()
+        for index, source in enumerate(self.sources):
+            process = self._context.Process(
+                target=run_source, name=f"source-{index}", daemon=True,
+                args=(source, index, self._reports, self._stop_event, self.options))
+            process.start()
+            self._processes.append(process)
+        return self
+
+    @property
+    def running(self):
+        return any(not s.get("done") for s in self.latest.values())
+
+    def poll(self, timeout=0.5):
+        """Drain pending worker summaries into `latest`."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                summary = self._reports.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            self.latest[summary["index"]] = summary
+        # A worker that crashed or was killed never sends its final summary
+        for index, process in enumerate(self._processes):
+            if process.exitcode not in (None, 0) and not self.latest[index].get("done"):
+                self.latest[index] = dict(self.latest[index], done=True,
+                                           error=f"exited with code {process.exitcode}")
+
+    def aggregate(self):
+        return aggregate(list(self.latest.values()))
+
+    def report(self):
+        lines = []
+        for s in self.latest.values():
+            status = "error: " + s["error"] if "error" in s else ("done" if s.get("done") else "running")
+            score = f"score {s['health_score']:.0f} ({s['strain_level']})" if "health_score" in s else "no face yet"
+            lines.append(f"  {s['tag']:<16} {s.get('fps', 0.0):5.1f} fps  "
+                         f"blinks {s.get('blinks', 0):4d}  {score}  [{status}]")
+        total = self.aggregate()
+        mean = f"{total['mean_health_score']:.1f}" if total["mean_health_score"] is not None else "-"
+        lines.append(f"  fleet: {total['active']}/{total['sources']} active, {total['fps']:.1f} fps, "
+                     f"mean score {mean}, strain {total['strain_counts']}")
+        return "\n".join(lines)
+
+    def stop(self, timeout=10.0):
+        """Ask workers to finish, collect their final summaries and join them."""
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        while self.running and time.monotonic() < deadline:
+            self.poll(timeout=0.2)
+        for process in self._processes:
+            process.join(timeout=max(deadline - time.monotonic(), 0.1))
+            if process.is_alive():
+                process.terminate()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor several cameras or streams, one process per source.")
+    parser.add_argument("sources", nargs="+", help="Camera indices, video files or stream URLs")
+    parser.add_argument("--tracking-mode", default="roi", choices=("roi", "flow", "full"))
+    parser.add_argument("--target-fps", type=float, default=15.0)
+    parser.add_argument("--no-flip", action="store_true", help="Do not mirror frames like the live view")
+    parser.add_argument("--eye-closed-thresh", type=float, default=0.30)
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL)
+    args = parser.parse_args()
+
+    supervisor = SourceSupervisor(args.sources, args.tracking_mode, args.target_fps, not args.no_flip,
+                                  args.eye_closed_thresh, args.report_interval).start()
+    stop_requested = []
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_requested.append(True))
+
+    last_report = time.monotonic()
+    while supervisor.running and not stop_requested:
+        supervisor.poll()
+        if time.monotonic() - last_report >= args.report_interval:
+            print(supervisor.report())
+            last_report = time.monotonic()
+    supervisor.stop()
+    print(supervisor.report())
+    for s in supervisor.latest.values():
+        if "log" in s:
+            print(f"📄 {s['tag']}: {s['log']}")
+
+
+if __name__ == "__main__":
+    main()
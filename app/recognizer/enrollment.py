@@ -0,0 +1,186 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+
+from vision.landmarks import LEFT_EYE, RIGHT_EYE, EYE_AND_IRIS, landmarks_to_array, to_normalized, eye_aspect_ratios
+
+EYE_INDICES = LEFT_EYE + RIGHT_EYE
+
+
+def score_crop(crop, ear, min_ear=0.30, exposure_range=(40, 215), max_clipped=0.2):
+    """
+    Quality of one eye crop for training.
+
+    Parameters:
+        crop (np.ndarray): BGR eye crop
+        ear (float): Average eye aspect ratio of the frame (normalized coordinates)
+        min_ear (float): Below this the eyes count as closed, as in BlinkDetector
+
+    Returns:
+        dict: sharpness (Laplacian variance), exposure (0-1, 1 = mid-gray),
+            ear, usable (bool) and quality (sharpness * exposure, 0 if unusable)
+    """
+    import cv2
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    sharpness = float(cv2.Laplacian(gray, cv2.CV_64F).var())
+    mean = float(gray.mean())
+    clipped = float(np.count_nonzero((gray < 5) | (gray > 250))) / gray.size
+    exposure = max(0.0, 1.0 - abs(mean - 128) / 128) * (1.0 - clipped)
+    usable = ear >= min_ear and exposure_range[0] <= mean <= exposure_range[1] and clipped <= max_clipped
+    return {"sharpness": sharpness, "exposure": exposure, "ear": float(ear), "usable": usable,
+            "quality": sharpness * exposure if usable else 0.0}
+
+
+def crop_signature(crop, size=(32, 16)):
+    """Zero-mean, unit-norm tiny grayscale copy used to tell near-duplicate crops apart."""
+    import cv2
+    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA).astype(np.float32).ravel()
+    small -= small.mean()
+    norm = np.linalg.norm(small)
+    return small / norm if norm else small
+
+
+def select_diverse(candidates, count, max_similarity=0.97):
+    """
+    Best `count` usable candidates, skipping ones too similar to an already picked crop.
+    If not enough distinct crops exist, the best remaining ones fill the gap.
+
+    Parameters:
+        candidates (list): dicts with "quality" and "signature"
+    """
+    ranked = sorted((c for c in candidates if c["quality"] > 0), key=lambda c: c["quality"], reverse=True)
+    picked = []
+    for candidate in ranked:
+        if len(picked) == count:
+            break
+        if all(float(candidate["signature"] @ p["signature"]) < max_similarity for p in picked):
+            picked.append(candidate)
+    for candidate in ranked:
+        if len(picked) == count:
+            break
+        if not any(candidate is p for p in picked):
+            picked.append(candidate)
+    return picked
+
+
+class EnrollmentEngine:
+    """
+    Burst enrollment of a new user in a background thread.
+
+    start() returns at once. The worker waits out a short countdown, grabs
+    a burst of frames as fast as the camera delivers them and runs FaceMesh
+    on each one, reusing a single instance across enrollments. It scores
+    every eye crop (sharpness, openness, exposure) and saves the best
+    `num_photos` distinct crops to the user's training folder. `progress`
+    is a snapshot dict the UI can poll: stage, frames, candidates, saved,
+    total and message. One enrollment runs at a time.
+
+    Parameters:
+        create_face_mesh (callable): Returns a mp FaceMesh; called once, on first use
+        camera (int | str): Capture source
+    """
+
+    def __init__(self, create_face_mesh, camera=0):
+        self.create_face_mesh = create_face_mesh
+        self.camera = camera
+        self._face_mesh = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._progress = {"stage": "idle"}
+
+    @property
+    def busy(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def progress(self):
+        with self._lock:
+            return dict(self._progress)
+
+    def _update(self, **changes):
+        with self._lock:
+            self._progress.update(changes)
+
+    def start(self, name, user_dir, num_photos, burst_frames=None, countdown=3.0):
+        """
+        Begin enrolling `name` into `user_dir`.
+
+        Returns:
+            bool: False if an enrollment is already running
+        """
+        if self.busy:
+            return False
+        burst_frames = burst_frames or max(30, 8 * num_photos)
+        with self._lock:
+            self._progress = {"stage": "countdown", "name": name, "frames": 0, "burst_frames": burst_frames,
+                              "candidates": 0, "saved": 0, "total": num_photos, "message": "Get ready..."}
+        self._thread = threading.Thread(target=self._run, name="enrollment", daemon=True,
+                                        args=(name, str(user_dir), num_photos, burst_frames, countdown))
+        self._thread.start()
+        return True
+
+    def _run(self, name, user_dir, num_photos, burst_frames, countdown):
+        # cv2 is imported here, on the engine's thread, so the dashboard's first render doesn't wait for it
+        import cv2
+        try:
+            if self._face_mesh is None:
+                self._face_mesh = self.create_face_mesh()
+            cap = cv2.VideoCapture(self.camera)
+            try:
+                time.sleep(countdown)
+                candidates = self._capture_burst(cap, burst_frames)
+            finally:
+                cap.release()
+            self._update(stage="selecting", message="Picking the sharpest open-eye crops...")
+            picked = select_diverse(candidates, num_photos)
+            self._save(picked, name, user_dir)
+            message = f"Saved {len(picked)} of {num_photos} snapshots for '{name}'"
+            if len(picked) < num_photos:
+                message += " (not enough sharp, open-eye frames; try better lighting)"
+            self._update(stage="done", message=message)
+        except Exception as e:
+            self._update(stage="error", message=str(e))
+
+    def _capture_burst(self, cap, burst_frames):
+        import cv2
+        from utils.snapshot_helpers import crop_eye_region
+        self._update(stage="capturing", message="Capturing burst... look at the camera")
+        candidates = []
+        for n in range(1, burst_frames + 1):
+            success, frame = cap.read()
+            if not success:
+                if n == 1:
+                    raise RuntimeError("Camera returned no frame")
+                break  # camera went away mid-burst: rank what we have
+            img_h, img_w = frame.shape[:2]
+            results = self._face_mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if results.multi_face_landmarks:
+                pts = landmarks_to_array(results.multi_face_landmarks[0].landmark, img_w, img_h, indices=EYE_AND_IRIS)
+                crop = crop_eye_region(frame, pts, EYE_INDICES)
+                if crop.size:
+                    ear = float(eye_aspect_ratios(to_normalized(pts, img_w, img_h)).mean())
+                    scores = score_crop(crop, ear)
+                    if scores["usable"]:
+                        candidates.append(dict(scores, crop=crop, signature=crop_signature(crop)))
+            self._update(frames=n, candidates=len(candidates))
+        return candidates
+
+    def _save(self, picked, name, user_dir):
+        import cv2
+        self._update(stage="saving")
+        os.makedirs(user_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        for k, candidate in enumerate(picked, 1):
+            # Burst crops share a timestamp, so number them to keep every file
+            cv2.imwrite(os.path.join(user_dir, f"{name}_{timestamp}_{k:02d}.jpg"), candidate["crop"])
+            self._update(saved=k)
+
+    def close(self):
+        if self._thread is not None:
+            self._thread.join()
+        if self._face_mesh is not None:
+            self._face_mesh.close()
@@ -1,42 +1,238 @@
 import cv2
 import os
 import json
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
 
-# Paths
-MODEL_PATH = "models/face_model.xml"
-LABEL_MAP_PATH = "models/label_map.json"
+from recognizer.train_face_recognizer import MODEL_PATH, LABEL_MAP_PATH
 
-# Load trained recognizer and label map
-recognizer = cv2.face.LBPHFaceRecognizer_create()
-if os.path.exists(MODEL_PATH):
-    recognizer.read(MODEL_PATH)
-else:
-    recognizer = None
+_model_lock = threading.Lock()
+_model = None  # (recognizer, label_map, mtime_ns of MODEL_PATH) once loaded
 
-if os.path.exists(LABEL_MAP_PATH):
-    with open(LABEL_MAP_PATH, "r") as f:
-        label_map = json.load(f)
-    label_map = {int(k): v for k, v in label_map.items()}
-else:
-    label_map = {}
+def load_recognizer():
+    """
+    The trained LBPH recognizer and label map, loaded on first use.
 
-def identify_eye_snapshot(image_path, threshold=70):
+    Cached process-wide and re-read only when the model file changes (e.g.
+    after the dashboard retrains), so importing this module costs nothing
+    and repeated calls are free.
+
+    Returns:
+        tuple: (recognizer or None, {label: name})
     """
-    Identify the person from an eye snapshot using LBPH face recognizer.
-    Returns the predicted name or "unknown" if confidence is too low.
+    global _model
+    with _model_lock:
+        mtime = os.stat(MODEL_PATH).st_mtime_ns if os.path.exists(MODEL_PATH) else None
+        if _model is not None and _model[2] == mtime:
+            return _model[0], _model[1]
+        recognizer = None
+        if mtime is not None:
+            recognizer = cv2.face.LBPHFaceRecognizer_create()
+            recognizer.read(MODEL_PATH)
+        label_map = {}
+        if os.path.exists(LABEL_MAP_PATH):
+            with open(LABEL_MAP_PATH, "r") as f:
+                label_map = {int(k): v for k, v in json.load(f).items()}
+        _model = (recognizer, label_map, mtime)
+        return recognizer, label_map
+
+def identify_eye_image(image, threshold=70):
     """
-    if not recognizer or not label_map:
-        return "unknown"
+    Identify the person from an in-memory eye crop using LBPH face recognizer.
 
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
-    if img is None:
-        return "unknown"
+    Parameters:
+        image (np.ndarray): BGR or grayscale eye crop
+        threshold (float): Largest LBPH distance still accepted as a match
+
+    Returns:
+        tuple: (name, confidence) where name is "unknown" if the match is too
+        weak and confidence is the LBPH distance (None if nothing was predicted)
+    """
+    if image is None or image.size == 0:
+        return "unknown", None
+    recognizer, label_map = load_recognizer()
+    if not recognizer or not label_map:
+        return "unknown", None
 
     try:
-        resized = cv2.resize(img, (200, 200))
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+        resized = cv2.resize(gray, (200, 200))
         label, confidence = recognizer.predict(resized)
         if confidence > threshold:
-            return "unknown"
-        return label_map.get(label, "unknown")
+            return "unknown", confidence
+        return label_map.get(label, "unknown"), confidence
     except Exception:
+        return "unknown", None
+
+def eye_signature(image, bins=32):
+    """Normalized grayscale histogram of an eye crop; cheap to compare with cv2.compareHist."""
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    hist = cv2.calcHist([gray], [0], None, [bins], [0, 256])
+    return cv2.normalize(hist, hist).flatten()
+
+def identify_eye_snapshot(image_path, threshold=70):
+    """
+    Identify the person from an eye snapshot using LBPH face recognizer.
+    Returns the predicted name or "unknown" if confidence is too low.
+    """
+    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
         return "unknown"
+    name, _ = identify_eye_image(img, threshold)
+    return name
+
+
+class EyeIdentificationWorker:
+    """
+    Runs identification off the frame thread.
+
+    submit() hands an eye crop to a background thread and returns at once;
+    the thread predicts, optionally writes the crop to
+    `snapshot_dir/<name>_<date>.jpg`, and poll() picks up the result on a
+    later frame. While a crop is being processed further submissions are
+    dropped, so the frame loop never waits. The model is loaded on the
+    worker thread as soon as it starts, not by the caller.
+
+    The last `cache_size` crops are remembered by histogram signature for
+    `cache_seconds`; a crop that correlates at least `same_correlation`
+    with one of them gets that crop's result back without running LBPH
+    again. The short lifetime keeps a wearer change from being answered
+    with the previous wearer's result.
+    """
+
+    def __init__(self, threshold=70, snapshot_dir=None, cache_size=8, same_correlation=0.98,
+                 cache_seconds=3.0):
+        self.threshold = threshold
+        self.snapshot_dir = snapshot_dir
+        self.cache_size = cache_size
+        self.same_correlation = same_correlation
+        self.cache_seconds = cache_seconds
+        self.predictions = 0
+        self.cache_hits = 0
+        self._cache = deque(maxlen=cache_size)  # (time, signature, (name, confidence)), newest last
+        self._cached_model = None  # recognizer the cached results came from
+        self._requests = queue.Queue(maxsize=1)
+        self._results = queue.Queue()
+        self.load_seconds = None
+        self._thread = threading.Thread(target=self._run, name="eye-identifier", daemon=True)
+        self._thread.start()
+
+    def submit(self, eye_crop, save_snapshot=True):
+        """Queue a crop for identification; returns False if the worker is busy or the crop is empty."""
+        if eye_crop is None or eye_crop.size == 0:
+            return False
+        try:
+            self._requests.put_nowait((eye_crop, save_snapshot))
+            return True
+        except queue.Full:
+            return False
+
+    def poll(self):
+        """Return the newest finished (name, confidence), or None if nothing new."""
+        result = None
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                return result
+
+    def _run(self):
+        start = time.perf_counter()
+        try:
+            load_recognizer()
+            self.load_seconds = time.perf_counter() - start
+        except Exception as e:
+            # _identify retries the load per request, e.g. once a model has been trained
+            print(f"⚠️ Could not load the eye recognizer: {e}")
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            eye_crop, save_snapshot = request
+            # One bad crop or a failed write must not end identification for the session
+            try:
+                name, confidence = self._identify(eye_crop)
+                if save_snapshot and self.snapshot_dir:
+                    os.makedirs(self.snapshot_dir, exist_ok=True)
+                    today = datetime.now().strftime("%Y-%m-%d")
+                    cv2.imwrite(os.path.join(self.snapshot_dir, f"{name}_{today}.jpg"), eye_crop)
+            except Exception as e:
+                print(f"⚠️ Eye identification failed: {e}")
+                continue
+            self._results.put((name, confidence))
+
+    def _identify(self, eye_crop):
+        if eye_crop is None or eye_crop.size == 0:
+            return "unknown", None
+        recognizer, _ = load_recognizer()
+        if recognizer is not self._cached_model:
+            # A retrained model may answer differently for the same crops
+            self._cache.clear()
+            self._cached_model = recognizer
+        now = time.monotonic()
+        while self._cache and now - self._cache[0][0] > self.cache_seconds:
+            self._cache.popleft()
+        signature = eye_signature(eye_crop)
+        for _, cached, result in reversed(self._cache):
+            if cv2.compareHist(signature, cached, cv2.HISTCMP_CORREL) >= self.same_correlation:
+                self.cache_hits += 1
+                return result
+        result = identify_eye_image(eye_crop, self.threshold)
+        self.predictions += 1
+        self._cache.append((now, signature, result))
+        return result
+
+    def close(self):
+        # Drop a pending crop rather than block behind it
+        try:
+            self._requests.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            self._requests.put_nowait(None)
+        except queue.Full:
+            pass  # submit() raced us; the daemon thread dies with the process
+        self._thread.join(timeout=2)
+
+
+class IdentityTracker:
+    """
+    Smooths a stream of (name, confidence) results into a stable identity.
+
+    Each result adds a weight to its name's score and every score decays
+    by `decay` per result. A match weighs more the further its LBPH
+    distance is below `threshold`, and "unknown" weighs `unknown_weight`.
+    The identity switches only when a name reaches `switch_score` and
+    leads the current identity by `margin`, so one bad frame can't
+    relabel the session, but a new wearer takes over after a few samples.
+    """
+
+    def __init__(self, threshold=70, decay=0.7, switch_score=1.0, margin=0.5, unknown_weight=0.5):
+        self.threshold = threshold
+        self.decay = decay
+        self.switch_score = switch_score
+        self.margin = margin
+        self.unknown_weight = unknown_weight
+        self.scores = {}
+        self.identity = None
+
+    def add(self, name, confidence):
+        """Feed one result; returns True if the identity changed."""
+        if name == "unknown" or confidence is None:
+            name, weight = "unknown", self.unknown_weight
+        else:
+            weight = 0.5 + 0.5 * max(self.threshold - confidence, 0) / self.threshold
+        for key in self.scores:
+            self.scores[key] *= self.decay
+        self.scores[name] = self.scores.get(name, 0.0) + weight
+
+        leader = max(self.scores, key=self.scores.get)
+        current = self.scores.get(self.identity, 0.0)
+        if (leader != self.identity and self.scores[leader] >= self.switch_score
+                and self.scores[leader] - current >= self.margin):
+            self.identity = leader
+            return True
+        return False
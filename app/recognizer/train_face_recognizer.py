@@ -2,52 +2,160 @@ import cv2
 import os
 import numpy as np
 import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 
-# Paths
-DATASET_DIR = "face_training"
-MODEL_PATH = "models/face_model.xml"
-LABEL_MAP_PATH = "models/label_map.json"
+# Paths (anchored to the repo so the dashboard and CLI train on the same data)
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+DATASET_DIR = str(DATA_DIR / "face_training")
+MODEL_PATH = str(DATA_DIR / "models" / "face_model.xml")
+LABEL_MAP_PATH = str(DATA_DIR / "models" / "label_map.json")
+SAMPLE_CACHE_PATH = str(DATA_DIR / "models" / "training_cache.npz")
+TRAINING_STATE_PATH = str(DATA_DIR / "models" / "training_state.json")
 
-def train_eye_recognizer():
-    recognizer = cv2.face.LBPHFaceRecognizer_create()
+SAMPLE_SIZE = (200, 200)
 
-    faces = []
-    labels = []
-    label_map = {}
-    current_label = 0
+def scan_dataset(dataset_dir=DATASET_DIR):
+    """
+    List every training image.
 
-    for person in os.listdir(DATASET_DIR):
-        person_dir = os.path.join(DATASET_DIR, person)
+    Returns:
+        dict: image path -> (person, mtime_ns)
+    """
+    samples = {}
+    for person in sorted(os.listdir(dataset_dir)):
+        person_dir = os.path.join(dataset_dir, person)
         if not os.path.isdir(person_dir):
             continue
+        for img_file in sorted(os.listdir(person_dir)):
+            img_path = os.path.join(person_dir, img_file)
+            samples[img_path] = (person, os.stat(img_path).st_mtime_ns)
+    return samples
 
-        label_map[current_label] = person
+def preprocess_image(img_path):
+    """Decode one training image into a 200x200 grayscale sample, or None."""
+    img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+    if img is None:
+        return None
+    try:
+        return cv2.resize(img, SAMPLE_SIZE)
+    except Exception as e:
+        print(f"Skipping image {os.path.basename(img_path)} due to error: {e}")
+        return None
 
-        for img_file in os.listdir(person_dir):
-            img_path = os.path.join(person_dir, img_file)
-            img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-            if img is None:
-                continue
+def load_sample_cache(cache_path=SAMPLE_CACHE_PATH):
+    """Return {path: (mtime_ns, sample)} from the preprocessed-sample cache."""
+    if not os.path.exists(cache_path):
+        return {}
+    try:
+        with np.load(cache_path) as cache:
+            return {str(p): (int(m), img) for p, m, img in zip(cache["paths"], cache["mtimes"], cache["images"])}
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable sample cache: {e}")
+        return {}
 
-            try:
-                face_resized = cv2.resize(img, (200, 200))
-                faces.append(face_resized)
-                labels.append(current_label)
-            except Exception as e:
-                print(f"Skipping image {img_file} due to error: {e}")
+def save_sample_cache(samples, cache_path=SAMPLE_CACHE_PATH):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    paths = sorted(samples)
+    images = np.stack([samples[p][1] for p in paths]) if paths else np.empty((0,) + SAMPLE_SIZE, np.uint8)
+    np.savez(cache_path, paths=np.array(paths), mtimes=np.array([samples[p][0] for p in paths], dtype=np.int64),
+             images=images)
 
-        current_label += 1
+def load_samples(dataset, max_workers=4):
+    """
+    Preprocessed samples for every image in `dataset`, decoding only files
+    that are new or changed since the cache was written; decoding runs in a
+    thread pool (cv2 releases the GIL while decoding and resizing).
 
-    if len(faces) == 0:
-        print("❌ No training data found.")
-        return False
+    Returns:
+        dict: image path -> (mtime_ns, 200x200 uint8 sample)
+    """
+    cache = load_sample_cache()
+    samples = {p: cache[p] for p, (_, mtime) in dataset.items() if p in cache and cache[p][0] == mtime}
+    missing = [p for p in dataset if p not in samples]
+    if missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for img_path, img in zip(missing, pool.map(preprocess_image, missing)):
+                if img is not None:
+                    samples[img_path] = (dataset[img_path][1], img)
+    if missing or len(samples) != len(cache):
+        save_sample_cache(samples)
+    return samples
 
-    recognizer.train(faces, np.array(labels))
-    os.makedirs("models", exist_ok=True)
-    recognizer.save(MODEL_PATH)
+def load_training_state(state_path=TRAINING_STATE_PATH):
+    if not os.path.exists(state_path) or not os.path.exists(MODEL_PATH):
+        return None
+    with open(state_path, "r") as f:
+        state = json.load(f)
+    state["label_map"] = {int(k): v for k, v in state["label_map"].items()}
+    return state
 
+def save_model(recognizer, label_map, trained, state_path=TRAINING_STATE_PATH):
+    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+    recognizer.save(MODEL_PATH)
     with open(LABEL_MAP_PATH, "w") as f:
         json.dump(label_map, f)
+    with open(state_path, "w") as f:
+        json.dump({"label_map": label_map, "trained": trained}, f)
+
+def train_eye_recognizer(full=False):
+    """
+    Train the LBPH recognizer on data/face_training.
+
+    When images were only added since the last run, the saved model is
+    extended with LBPH's update() using just the new images. Deleting,
+    renaming or changing existing images (or full=True) triggers a full
+    retrain, since LBPH cannot forget samples.
+
+    Returns:
+        bool: True if a model is saved and up to date, False if there is no data
+    """
+    if not os.path.isdir(DATASET_DIR):
+        print(f"❌ Training folder not found: {DATASET_DIR}")
+        return False
+
+    dataset = scan_dataset()
+    samples = load_samples(dataset)
+    if not samples:
+        print("❌ No training data found.")
+        return False
+
+    state = None if full else load_training_state()
+    if state is not None:
+        trained = state["trained"]  # path -> [person, mtime_ns]
+        unchanged = all(p in dataset and list(dataset[p]) == v for p, v in trained.items())
+        if unchanged:
+            new_paths = [p for p in samples if p not in trained]
+            if not new_paths:
+                print("✅ Model already up to date")
+                return True
+
+            label_map = state["label_map"]
+            labels_by_name = {name: label for label, name in label_map.items()}
+            for p in new_paths:
+                person = dataset[p][0]
+                if person not in labels_by_name:
+                    labels_by_name[person] = max(label_map, default=-1) + 1
+                    label_map[labels_by_name[person]] = person
+
+            recognizer = cv2.face.LBPHFaceRecognizer_create()
+            recognizer.read(MODEL_PATH)
+            recognizer.update([samples[p][1] for p in new_paths],
+                              np.array([labels_by_name[dataset[p][0]] for p in new_paths]))
+            trained.update({p: list(dataset[p]) for p in new_paths})
+            save_model(recognizer, label_map, trained)
+            print(f"✅ Model updated with {len(new_paths)} new images and saved to {MODEL_PATH}")
+            return True
+
+    # Full retrain
+    persons = sorted({person for person, _ in dataset.values()})
+    labels_by_name = {person: label for label, person in enumerate(persons)}
+    label_map = {label: person for person, label in labels_by_name.items()}
+    paths = sorted(samples)
+
+    recognizer = cv2.face.LBPHFaceRecognizer_create()
+    recognizer.train([samples[p][1] for p in paths], np.array([labels_by_name[dataset[p][0]] for p in paths]))
+    save_model(recognizer, label_map, {p: list(dataset[p]) for p in paths})
 
     print(f"✅ Model trained and saved to {MODEL_PATH}")
     print(f"🗂️ Label map saved to {LABEL_MAP_PATH}")
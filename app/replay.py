@@ -0,0 +1,189 @@
+"""
+Replay landmark recordings through the session logic faster than real time.
+
+Recordings made with `main.py --record` keep per-frame landmarks,
+measurements and, optionally, left-eye crops. Replaying them runs EAR and
+pupil diameter vectorized over each memory-mapped chunk. Redness comes
+from the recorded values, or is recomputed from the crops when --redness-level
+is swept. Blink detection, the health score and the log cadence then run
+through an EyeSession on the recorded timeline, so changing a threshold no
+longer means recapturing video and running FaceMesh again.
+
+Every combination of the swept parameters is replayed in its own worker
+process and summarized in one table.
+
+Usage:
+    python replay.py data/recordings/eye_health_log_2025-01-01_10-00-00
+    python replay.py REC --eye-closed-thresh 0.25 0.28 0.30 --redness-threshold 0.04 0.05 --workers 4
+    python replay.py REC --eye-closed-thresh 0.28 --out-dir data/logs/replay
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from eye_session import EyeSession, LOG_INTERVAL, REDNESS_HIGH
+from vision.landmarks import LEFT_EYE, LEFT_IRIS, to_normalized, eye_aspect_ratios, iris_diameter
+from vision.redness_detection import RednessEngine, REDNESS_LEVEL
+from utils.landmark_recording import LandmarkRecording
+from utils.logging_helpers import SessionLogger
+
+
+class RowCollector:
+    """Stand-in for SessionLogger that keeps rows in memory (sweeps without --out-dir)."""
+
+    filename = None
+
+    def __init__(self):
+        self.rows = []
+
+    def log(self, row):
+        self.rows.append(row)
+
+    def close(self):
+        pass
+
+
+def roi_redness(chunk, engine):
+    """Recompute left-eye redness from the recorded crops; NaN where no crop was stored."""
+    out = np.full(len(chunk["times"]), np.nan)
+    landmarks, rois, boxes = chunk["landmarks"], chunk["roi"], chunk["roi_boxes"]
+    for i in np.flatnonzero(~np.isnan(boxes[:, 0])):
+        x0, y0, scale = boxes[i]
+        eye_pts = (landmarks[i, LEFT_EYE].astype(np.int32) - (int(x0), int(y0))) * scale
+        out[i] = engine.measure(rois[i], eye_pts.astype(np.int32))
+    return out
+
+
+def recording_measurements(recording, redness_level=None):
+    """
+    Per-frame measurements for a whole recording.
+
+    Parameters:
+        recording (LandmarkRecording): Source recording
+        redness_level (int): Recompute redness from the stored crops with this
+            pixel threshold; None uses the recorded redness
+
+    Returns:
+        np.ndarray: (frames, 4) float64 array of [t, avg_ear, redness, pupil_diameter]
+    """
+    if redness_level is not None and not recording.has_rois:
+        raise ValueError(f"{recording.path} has no eye crops; record with --record-rois to sweep redness")
+    names = ("times", "metrics", "landmarks") + (("roi", "roi_boxes") if redness_level is not None else ())
+    engine = RednessEngine(level=redness_level) if redness_level is not None else None
+    parts = []
+    for chunk in recording.chunks(names):
+        norm_pts = to_normalized(np.asarray(chunk["landmarks"]), recording.img_w, recording.img_h)
+        rows = np.empty((len(chunk["times"]), 4))
+        rows[:, 0] = chunk["times"]
+        rows[:, 1] = eye_aspect_ratios(norm_pts).mean(axis=1)
+        rows[:, 2] = chunk["metrics"][:, 1] if engine is None else roi_redness(chunk, engine)
+        rows[:, 3] = iris_diameter(norm_pts, LEFT_IRIS)
+        parts.append(rows)
+    return np.concatenate(parts) if parts else np.empty((0, 4))
+
+
+def replay(rows, session_logger, eye_closed_thresh=0.30, redness_threshold=REDNESS_HIGH, log_interval=LOG_INTERVAL):
+    """
+    Feed measurements through an EyeSession on the recorded timeline.
+
+    Returns:
+        EyeSession: the finished (closed) session
+    """
+    session = EyeSession(session_logger, eye_closed_thresh=eye_closed_thresh, log_interval=log_interval,
+                         redness_threshold=redness_threshold)
+    for t, avg_ear, redness, pupil_diameter in rows.tolist():
+        if avg_ear != avg_ear:  # NaN: no face on this frame
+            session.no_face(t)
+        else:
+            session.update(avg_ear, redness, pupil_diameter, timestamp=t)
+    session.close()
+    return session
+
+
+def replay_params(rows, params, log_filename=None):
+    """Worker: replay one parameter combination and summarize it."""
+    start = time.perf_counter()
+    logger = SessionLogger(log_filename, flush_rows=1000) if log_filename else RowCollector()
+    session = replay(rows, logger, params["eye_closed_thresh"], params["redness_threshold"], params["log_interval"])
+    seconds = time.perf_counter() - start
+    summary = dict(params, frames=session.frames, blinks=session.blink_detector.blink_counter,
+                   rows=session.rows_logged, replay_seconds=seconds, log=log_filename)
+    if session.latest is not None:
+        summary.update(final_score=session.latest["health_score"], final_strain=session.latest["strain_level"])
+    if isinstance(logger, RowCollector) and logger.rows:
+        scores = [r["health_score"] for r in logger.rows]
+        summary.update(mean_score=float(np.mean(scores)), min_score=float(np.min(scores)))
+    return summary
+
+
+def sweep(path, eye_closed_threshs=(0.30,), redness_thresholds=(REDNESS_HIGH,), redness_levels=(None,),
+          log_interval=LOG_INTERVAL, workers=None, out_dir=None):
+    """
+    Replay a recording once per parameter combination.
+
+    Measurements are computed once per redness level in this process and
+    shared with the workers, which only run the stateful session logic.
+
+    Returns:
+        list: one summary dict per combination
+    """
+    recording = LandmarkRecording(path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    jobs = []
+    for level in redness_levels:
+        rows = recording_measurements(recording, level)
+        for thresh, redness_threshold in itertools.product(eye_closed_threshs, redness_thresholds):
+            params = {"eye_closed_thresh": thresh, "redness_threshold": redness_threshold,
+                      "redness_level": level if level is not None else REDNESS_LEVEL, "log_interval": log_interval}
+            log_filename = None
+            if out_dir:
+                name = f"{os.path.basename(os.path.normpath(path))}_ear{thresh}_red{redness_threshold}_lvl{params['redness_level']}"
+                log_filename = os.path.join(out_dir, name + ".csv")
+                if os.path.exists(log_filename):
+                    os.remove(log_filename)
+            jobs.append((rows, params, log_filename))
+
+    if len(jobs) == 1:
+        return [replay_params(*jobs[0])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(replay_params, *zip(*jobs)))
+
+
+def format_summary(summary, duration):
+    speed = duration / summary["replay_seconds"] if summary["replay_seconds"] else float("inf")
+    scores = (f"score mean {summary['mean_score']:5.1f} min {summary['min_score']:5.1f}"
+              if "mean_score" in summary else f"final score {summary.get('final_score', '-')}")
+    return (f"EAR<{summary['eye_closed_thresh']:.2f} red>{summary['redness_threshold']:.3f} "
+            f"lvl {summary['redness_level']:3d}: {summary['blinks']:5d} blinks, {scores}, "
+            f"strain {summary.get('final_strain', '-')}, {summary['rows']} rows ({speed:,.0f}x real time)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay landmark recordings with different parameters.")
+    parser.add_argument("recording", help="Recording folder written by main.py --record")
+    parser.add_argument("--eye-closed-thresh", type=float, nargs="+", default=[0.30])
+    parser.add_argument("--redness-threshold", type=float, nargs="+", default=[REDNESS_HIGH])
+    parser.add_argument("--redness-level", type=int, nargs="+", default=None,
+                        help="Recompute redness from stored eye crops with these pixel thresholds")
+    parser.add_argument("--log-interval", type=float, default=LOG_INTERVAL)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--out-dir", help="Write one session log per combination here")
+    args = parser.parse_args()
+
+    recording = LandmarkRecording(args.recording)
+    print(f"🎞️ {args.recording}: {len(recording)} frames, {recording.duration / 60:.1f} min")
+    summaries = sweep(args.recording, args.eye_closed_thresh, args.redness_threshold,
+                      args.redness_level or [None], args.log_interval, args.workers, args.out_dir)
+    for summary in summaries:
+        print(format_summary(summary, recording.duration))
+        if summary["log"]:
+            print(f"   📄 {summary['log']}")
+
+
+if __name__ == "__main__":
+    main()
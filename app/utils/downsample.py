@@ -0,0 +1,54 @@
+import numpy as np
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Picks `n_out` points (always keeping the first and last) that preserve the
+    visual shape of the series: peaks, dips and slopes survive where plain
+    striding would drop them.
+
+    Parameters:
+        x, y (np.ndarray): 1-D series of equal length, x sorted ascending
+        n_out (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Sorted indices of the kept points
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # n_out - 2 buckets over the interior points; first and last are fixed
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    kept = np.empty(n_out, dtype=np.int64)
+    kept[0], kept[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+    return kept
+
+def downsample_series(df, x_col, y_col, n_out):
+    """
+    LTTB-downsample one column of a DataFrame for charting.
+
+    Returns:
+        pd.DataFrame: at most `n_out` rows of `y_col`, indexed by `x_col`
+    """
+    series = df[[x_col, y_col]].dropna()
+    idx = lttb_indices(series[x_col].to_numpy(), series[y_col].to_numpy(), n_out)
+    return series.iloc[idx].set_index(x_col)
@@ -0,0 +1,170 @@
+"""
+Compact, memory-mappable recordings of per-frame landmarks.
+
+A recording is a folder of fixed-size chunks of plain .npy files plus a
+meta.json index:
+
+    chunk_00000_times.npy      (n,)          float64  session clock, seconds
+    chunk_00000_metrics.npy    (n, 3)        float32  avg_ear, redness, pupil_diameter
+    chunk_00000_landmarks.npy  (n, 478, 2)   float32  pixel-space landmarks
+    chunk_00000_roi.npy        (n, h, w, 3)  uint8    optional left-eye crops
+    chunk_00000_roi_boxes.npy  (n, 3)        float32  crop origin x, y and scale
+
+Frames without a face have NaN metrics and landmarks. Chunks are written
+on a background thread when full, so recording does not stall the live
+loop. On replay they are opened with mmap_mode="r", so only the pages
+that are actually read get loaded.
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from vision.landmarks import LEFT_EYE, NUM_LANDMARKS, eye_bbox
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+ROI_SIZE = (48, 96)  # (h, w) canvas for left-eye crops
+ROI_PADDING = 4
+
+
+def chunk_prefix(index):
+    return f"chunk_{index:05d}"
+
+
+class LandmarkRecorder:
+    """
+    Appends frames to a recording folder, `chunk_frames` per chunk.
+
+    Parameters:
+        path (str): Recording folder (created if missing)
+        chunk_frames (int): Frames per chunk (1800 = one minute at 30 fps)
+        rois (bool): Also store a left-eye crop per frame so redness can be recomputed
+    """
+
+    def __init__(self, path, chunk_frames=1800, rois=False):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.rois = rois
+        os.makedirs(path, exist_ok=True)
+        self.meta = {"version": FORMAT_VERSION, "num_landmarks": NUM_LANDMARKS, "img_w": None, "img_h": None,
+                     "chunk_frames": chunk_frames, "rois": rois, "roi_size": list(ROI_SIZE), "chunks": []}
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._pending = []
+        self._new_chunk()
+
+    def _new_chunk(self):
+        n = self.chunk_frames
+        self._times = np.empty(n, dtype=np.float64)
+        self._metrics = np.full((n, 3), np.nan, dtype=np.float32)
+        self._landmarks = np.full((n, NUM_LANDMARKS, 2), np.nan, dtype=np.float32)
+        if self.rois:
+            self._roi = np.zeros((n,) + ROI_SIZE + (3,), dtype=np.uint8)
+            self._roi_boxes = np.full((n, 3), np.nan, dtype=np.float32)
+        self._count = 0
+
+    def add(self, timestamp, pts, values=None, frame=None):
+        """
+        Record one frame.
+
+        Parameters:
+            timestamp (float): Session clock time of the frame
+            pts (np.ndarray | None): (478, 2) pixel-space landmarks, None if no face
+            values (dict | None): EyeSession values (avg_ear, redness, pupil_diameter)
+            frame (np.ndarray): BGR frame, only used when recording ROIs
+        """
+        i = self._count
+        self._times[i] = timestamp
+        if frame is not None and self.meta["img_w"] is None:
+            self.meta["img_h"], self.meta["img_w"] = frame.shape[:2]
+        if pts is not None:
+            self._landmarks[i] = pts
+            if values is not None:
+                self._metrics[i] = values["avg_ear"], values["redness"], values["pupil_diameter"]
+            if self.rois and frame is not None:
+                self._roi_boxes[i] = self._store_roi(frame, pts, self._roi[i])
+        self._count += 1
+        if self._count == self.chunk_frames:
+            self._flush_chunk()
+
+    @staticmethod
+    def _store_roi(frame, pts, canvas):
+        img_h, img_w = frame.shape[:2]
+        x0, y0, x1, y1 = eye_bbox(pts, LEFT_EYE, img_w, img_h, padding=ROI_PADDING)
+        crop = frame[y0:y1, x0:x1]
+        if crop.size == 0:
+            return np.nan, np.nan, np.nan
+        # Crops are stored unscaled when they fit, so redness recomputes exactly
+        scale = min(ROI_SIZE[0] / crop.shape[0], ROI_SIZE[1] / crop.shape[1], 1.0)
+        if scale < 1.0:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        canvas[:crop.shape[0], :crop.shape[1]] = crop
+        return x0, y0, scale
+
+    def _flush_chunk(self):
+        if self._count == 0:
+            return
+        n = self._count
+        index = len(self.meta["chunks"])
+        arrays = {"times": self._times[:n], "metrics": self._metrics[:n], "landmarks": self._landmarks[:n]}
+        if self.rois:
+            arrays.update(roi=self._roi[:n], roi_boxes=self._roi_boxes[:n])
+        self.meta["chunks"].append({"prefix": chunk_prefix(index), "frames": n,
+                                    "t0": float(self._times[0]), "t1": float(self._times[n - 1])})
+        meta = json.loads(json.dumps(self.meta))
+        self._pending.append(self._writer.submit(self._write_chunk, index, arrays, meta))
+        self._new_chunk()
+
+    def _write_chunk(self, index, arrays, meta):
+        for name, array in arrays.items():
+            np.save(os.path.join(self.path, f"{chunk_prefix(index)}_{name}.npy"), array)
+        # The index is rewritten after every chunk so a crash loses at most one chunk
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def close(self):
+        self._flush_chunk()
+        self._writer.shutdown(wait=True)
+        for future in self._pending:
+            future.result()  # surface write errors
+        self._pending = []
+
+
+class LandmarkRecording:
+    """
+    Read side of a recording folder. Chunk arrays are memory-mapped.
+
+    Usage:
+        recording = LandmarkRecording("data/recordings/eye_health_log_...")
+        for chunk in recording.chunks():
+            chunk["times"], chunk["metrics"], chunk["landmarks"]
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, META_FILE)) as f:
+            self.meta = json.load(f)
+        if self.meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported recording version {self.meta['version']} in {path}")
+        self.img_w = self.meta["img_w"]
+        self.img_h = self.meta["img_h"]
+        self.has_rois = self.meta["rois"]
+
+    def __len__(self):
+        return sum(c["frames"] for c in self.meta["chunks"])
+
+    @property
+    def duration(self):
+        chunks = self.meta["chunks"]
+        return chunks[-1]["t1"] - chunks[0]["t0"] if chunks else 0.0
+
+    def load(self, index, name):
+        prefix = self.meta["chunks"][index]["prefix"]
+        return np.load(os.path.join(self.path, f"{prefix}_{name}.npy"), mmap_mode="r")
+
+    def chunks(self, names=("times", "metrics", "landmarks")):
+        """Yield one dict of memory-mapped arrays per chunk, in time order."""
+        for index in range(len(self.meta["chunks"])):
+            yield {name: self.load(index, name) for name in names}
@@ -0,0 +1,243 @@
+"""
+Live metrics over a local socket as newline-delimited JSON.
+
+main.py publishes one sample per processed frame. The dashboard (or any
+`nc 127.0.0.1 8765`) subscribes. The publisher runs an asyncio server on
+its own thread. publish() only hands the sample to that loop, and every
+subscriber has its own bounded drop-oldest queue drained at that
+subscriber's pace. A slow or stalled viewer loses old samples; it never
+blocks the capture loop.
+
+With `backfill` enabled, a new subscriber first receives the session's
+recent history: the publisher raises `backfill_pending`, and the
+publishing thread answers with backfill() (see history_samples()).
+"""
+import asyncio
+import json
+import math
+import os
+import socket
+import threading
+import time
+from collections import deque
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class MetricsPublisher:
+    """
+    Fan-out NDJSON server on a background asyncio loop.
+
+    Parameters:
+        host, port: TCP address to listen on (ignored when `path` is set)
+        path (str): Unix socket path instead of TCP
+        max_queue (int): Samples buffered per subscriber before the oldest are dropped
+        backfill (bool): Hold new subscribers until backfill() sends them the history
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, max_queue=256, backfill=False):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.max_queue = max_queue
+        self.dropped = 0
+        self.backfill_pending = False
+        self._backfill = backfill
+        self._queues = set()
+        self._waiting = []  # subscribers held until the next backfill()
+        self._loop = asyncio.new_event_loop()
+        self._server = None
+        self._ready = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="live-metrics", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        if self._error:
+            raise self._error
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        try:
+            if self.path:
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                start = asyncio.start_unix_server(self._serve, path=self.path)
+            else:
+                start = asyncio.start_server(self._serve, self.host, self.port)
+            self._server = self._loop.run_until_complete(start)
+        except OSError as e:
+            self._error = e
+            self._ready.set()
+            return
+        self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        tasks = asyncio.all_tasks(self._loop)
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.close()
+
+    @property
+    def subscribers(self):
+        return len(self._queues)
+
+    def publish(self, sample):
+        """Queue one sample (a JSON-serializable dict) for every subscriber. Never blocks."""
+        if self._queues and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._fan_out, sample)
+
+    def backfill(self, samples):
+        """Send `samples` to subscribers waiting for history, then start their live stream."""
+        blob = "".join(json.dumps(sample) + "\n" for sample in samples).encode()
+        if not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._release, blob)
+
+    def _release(self, blob):
+        for queue in self._waiting:
+            if blob:
+                queue.put_nowait(blob)
+            self._queues.add(queue)
+        self._waiting = []
+        self.backfill_pending = False
+
+    def _fan_out(self, sample):
+        line = (json.dumps(sample) + "\n").encode()
+        for queue in self._queues:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(line)
+
+    async def _serve(self, reader, writer):
+        queue = asyncio.Queue(self.max_queue)
+        if self._backfill:
+            self._waiting.append(queue)
+            self.backfill_pending = True
+        else:
+            self._queues.add(queue)
+        try:
+            while True:
+                writer.write(await queue.get())
+                # Waits only for this subscriber's socket; other subscribers keep flowing
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._queues.discard(queue)
+            if queue in self._waiting:
+                self._waiting.remove(queue)
+            writer.close()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=2.0)
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class MetricsSubscriber:
+    """
+    Background reader of a MetricsPublisher stream into a bounded buffer.
+
+    The reader thread keeps draining the socket whatever the caller is doing,
+    so the publisher never sees backpressure from a slow UI; the newest
+    `maxlen` samples are kept and older ones fall off. Reconnects
+    automatically when the live app restarts.
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, maxlen=600, retry_seconds=2.0):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.retry_seconds = retry_seconds
+        self.connected = False
+        self.received = 0
+        self._samples = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="live-metrics-reader", daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        if self.path:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.path)
+        else:
+            sock = socket.create_connection((self.host, self.port), timeout=self.retry_seconds)
+        sock.settimeout(1.0)
+        return sock
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sock = self._connect()
+            except OSError:
+                self._stop.wait(self.retry_seconds)
+                continue
+            self.connected = True
+            with self._lock:
+                # A (re)connect starts a fresh view; a backfilling publisher resends history
+                self._samples.clear()
+            try:
+                self._read(sock)
+            finally:
+                self.connected = False
+                sock.close()
+
+    def _read(self, sock):
+        buffer = b""
+        while not self._stop.is_set():
+            try:
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            if not chunk:
+                return
+            *lines, buffer = (buffer + chunk).split(b"\n")
+            samples = [json.loads(line) for line in lines if line]
+            with self._lock:
+                self._samples.extend(samples)
+                self.received += len(samples)
+
+    def samples(self):
+        """Snapshot of the buffered samples, oldest first."""
+        with self._lock:
+            return list(self._samples)
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+
+
+def live_sample(values):
+    """The subset of EyeSession values sent to viewers, stamped with wall-clock time."""
+    keys = ("elapsed", "blinks", "blink_rate", "redness", "pupil_diameter", "health_score",
+            "strain_level", "avg_ear", "user_name")
+    sample = {key: values[key] for key in keys if key in values}
+    sample["time"] = time.time()
+    return sample
+
+
+def history_samples(history, seconds):
+    """
+    Backfill samples for a new subscriber from a TimeSeriesStore: the past
+    `seconds` of elapsed time at the finest resolution that covers them.
+    """
+    table = history.table(seconds)
+    fields = [name for name in table if name != "time"]
+    samples = []
+    for i, elapsed in enumerate(table["time"]):
+        sample = {"elapsed": float(elapsed)}
+        for name in fields:
+            value = float(table[name][i])
+            sample[name] = None if math.isnan(value) else value
+        samples.append(sample)
+    return samples
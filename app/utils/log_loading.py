@@ -0,0 +1,94 @@
+import io
+import os
+import threading
+
+import pandas as pd
+
+def read_log(path):
+    """Read a whole session log (.csv or .parquet) into a DataFrame."""
+    if str(path).endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+class IncrementalLogReader:
+    """
+    Cached view of one session log that re-reads only what changed.
+
+    read() compares the file's inode, size and mtime with the last read. An
+    unchanged file returns the cached DataFrame without touching the disk
+    beyond a stat(). A CSV that only grew (a session still being written)
+    has just its appended complete lines parsed and concatenated; it counts
+    as grown only if it is the same inode and the last line already parsed
+    is still in place. Anything else (a shrunk, replaced or rewritten file,
+    or Parquet) is reloaded in full.
+
+    A Parquet log that is still being written has no footer yet and can't
+    be read; read() then keeps returning the last good DataFrame (empty if
+    there is none) and sets `error` until the file becomes readable.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._df = None
+        self._columns = None
+        self._offset = 0
+        self._last_line = b""  # the line that ends at _offset
+        self._signature = None
+        self.error = None
+
+    @property
+    def signature(self):
+        """(inode, size, mtime_ns) of the file as of the DataFrame read() last returned."""
+        return self._signature
+
+    def read(self):
+        with self._lock:
+            stat = os.stat(self.path)
+            signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            if self._df is not None and signature == self._signature:
+                return self._df
+
+            if self.path.endswith(".parquet"):
+                try:
+                    self._df = pd.read_parquet(self.path)
+                except Exception as e:
+                    self.error = e
+                    return self._df if self._df is not None else pd.DataFrame()
+                self.error = None
+            elif self._is_append(stat):
+                self._append_tail()
+            else:
+                self._offset = 0
+                self._columns = None
+                self._append_tail()
+            self._signature = signature
+            return self._df
+
+    def _is_append(self, stat):
+        if not self._columns or stat.st_ino != self._signature[0] or stat.st_size < self._offset:
+            return False
+        # Same inode and no shorter, but it may have been rewritten in place
+        with open(self.path, "rb") as f:
+            f.seek(self._offset - len(self._last_line))
+            return f.read(len(self._last_line)) == self._last_line
+
+    def _append_tail(self):
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            tail = f.read()
+        # Only parse complete lines; a half-written row is picked up next time
+        complete = tail.rfind(b"\n") + 1
+        if self._columns is None:
+            if complete == 0:
+                self._df = pd.DataFrame()
+                return
+            self._df = pd.read_csv(io.BytesIO(tail[:complete]))
+            self._columns = list(self._df.columns)
+        elif complete:
+            new_rows = pd.read_csv(io.BytesIO(tail[:complete]), header=None, names=self._columns)
+            self._df = new_rows if self._df.empty else pd.concat([self._df, new_rows], ignore_index=True)
+        if complete:
+            self._last_line = tail[tail.rfind(b"\n", 0, complete - 1) + 1:complete]
+        self._offset += complete
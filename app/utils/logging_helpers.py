@@ -2,17 +2,33 @@
 
 import os
 import csv
+import re
+import atexit
+import threading
+import time
 from datetime import datetime
 
 def ensure_logs_folder():
     """Create logs/ folder if it doesn't exist."""
     os.makedirs("data/logs", exist_ok=True)
 
-def create_timestamped_log_file():
-    """Return a new timestamped log filename inside /logs/."""
-    timestamp = datetime.now().strftime("eye_health_log_%Y-%m-%d_%H-%M-%S.csv")
+def create_timestamped_log_file(extension="csv", tag=None, started_at=None):
+    """
+    Return a new timestamped log filename inside /logs/.
+    `tag` (e.g. a source name) is appended so concurrent sessions don't collide;
+    `started_at` (default: now) is the session start put in the name.
+    """
+    suffix = f"_{tag}" if tag else ""
+    timestamp = (started_at or datetime.now()).strftime(f"eye_health_log_%Y-%m-%d_%H-%M-%S{suffix}.{extension}")
     return os.path.join("data/logs", timestamp)
 
+def filename_tag(*parts):
+    """
+    Join `parts` into a filename-safe log tag. Everything but letters, digits
+    and "-" becomes "-", so a tag can't look like a SessionLogger "_part<N>" suffix.
+    """
+    return re.sub(r"[^A-Za-z0-9-]+", "-", "-".join(str(p) for p in parts if p != "")).strip("-")
+
 def log_data(filename, data):
     """
     Appends a row of data (a dictionary) to a CSV file.
@@ -25,3 +41,208 @@ def log_data(filename, data):
         if write_header:
             writer.writeheader()
         writer.writerow(data)
+
+
+class CsvSink:
+    """
+    Keeps one CSV file open; the file is created and the header written
+    with the first rows, so a session that never logs leaves no empty file.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self._file = None
+        self._writer = None
+
+    def write(self, rows):
+        if self._writer is None:
+            write_header = not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0
+            self._file = open(self.filename, 'a', newline='')
+            self._writer = csv.DictWriter(self._file, fieldnames=list(rows[0].keys()))
+            if write_header:
+                self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def size(self):
+        return self._file.tell() if self._file is not None else 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class ParquetSink:
+    """Columnar sink: every flush becomes one row group of a single Parquet file."""
+
+    def __init__(self, filename):
+        import pyarrow.parquet as pq
+
+        self.filename = filename
+        self._pq = pq
+        self._writer = None
+
+    def write(self, rows):
+        import pyarrow as pa
+
+        # Metrics such as health_score start as ints and turn into floats later in
+        # a session; storing every number as float64 keeps the schema stable.
+        rows = [{k: float(v) if isinstance(v, int) and not isinstance(v, bool) else v
+                 for k, v in row.items()} for row in rows]
+        table = pa.Table.from_pylist(rows)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.filename, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def size(self):
+        return os.path.getsize(self.filename) if os.path.exists(self.filename) else 0
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+SINKS = {"csv": CsvSink, "parquet": ParquetSink}
+
+
+class _Split:
+    """Buffer marker: rows after it go to a new file tagged `tag`."""
+
+    __slots__ = ("tag",)
+
+    def __init__(self, tag):
+        self.tag = tag
+
+
+class SessionLogger:
+    """
+    Buffered session log that never touches the disk on the caller's thread.
+
+    log() only appends the row to an in-memory buffer. A background thread
+    writes the buffer when `flush_interval` seconds have passed or
+    `flush_rows` rows are waiting, and close() (also registered with atexit)
+    guarantees a final flush. split() starts a new file at a point in the
+    row stream, e.g. when the wearer changes.
+
+    Parameters:
+        filename (str): First log file; its extension picks the sink (.csv or .parquet)
+        flush_interval (float): Max seconds a row waits in memory
+        flush_rows (int): Buffered rows that trigger an early flush
+        rotate_bytes (int): Start a new file once the current one reaches this size
+        rotate_seconds (float): Start a new file after this many seconds
+    """
+
+    def __init__(self, filename, flush_interval=2.0, flush_rows=100, rotate_bytes=None, rotate_seconds=None):
+        base, extension = os.path.splitext(filename)
+        self.format = extension.lstrip(".").lower()
+        if self.format not in SINKS:
+            raise ValueError(f"Unsupported log format: {extension}")
+        self._base = base
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.files = []
+
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._part = 1
+        self._sink = self._open_sink(filename)
+
+        self._thread = threading.Thread(target=self._run, name="session-logger", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def filename(self):
+        return self._sink.filename
+
+    def _open_sink(self, filename):
+        os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+        self._opened_at = time.monotonic()
+        self.files.append(filename)
+        return SINKS[self.format](filename)
+
+    def log(self, row):
+        """Queue one row (a dictionary); returns immediately."""
+        with self._lock:
+            self._buffer.append(row)
+            pending = len(self._buffer)
+        if pending >= self.flush_rows:
+            self._wake.set()
+
+    def split(self, tag):
+        """
+        Send the rows logged after this call to a new file named
+        <base>_part<N>_<tag>; returns immediately like log().
+        """
+        tag = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(tag))
+        with self._lock:
+            self._buffer.append(_Split(tag))
+        self._wake.set()
+
+    def flush(self):
+        """Write every buffered row now, rotating the file first if it is due."""
+        with self._write_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+            if not rows:
+                return
+            if self._rotation_due():
+                self._next_sink()
+            segment = []
+            for row in rows:
+                if isinstance(row, _Split):
+                    self._write(segment)
+                    segment = []
+                    self._next_sink(row.tag)
+                else:
+                    segment.append(row)
+            self._write(segment)
+
+    def _next_sink(self, tag=None):
+        self._sink.close()
+        self._part += 1
+        suffix = f"_{tag}" if tag else ""
+        self._sink = self._open_sink(f"{self._base}_part{self._part}{suffix}.{self.format}")
+
+    def _write(self, rows):
+        if not rows:
+            return
+        try:
+            self._sink.write(rows)
+        except Exception as e:
+            print(f"⚠️ Failed to write {len(rows)} log rows to {self.filename}: {e}")
+
+    def _rotation_due(self):
+        if self.rotate_bytes and self._sink.size() >= self.rotate_bytes:
+            return True
+        if self.rotate_seconds and time.monotonic() - self._opened_at >= self.rotate_seconds:
+            return True
+        return False
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Stop the writer thread, flush what is left and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+        self._sink.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
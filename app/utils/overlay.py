@@ -0,0 +1,110 @@
+import cv2
+import numpy as np
+
+from vision.landmarks import LEFT_EYE, RIGHT_EYE, LEFT_IRIS, eye_polygon
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+def draw_eye_outline(frame, pts, eye_indices, color=(0, 255, 255)):
+    cv2.polylines(frame, [eye_polygon(pts, eye_indices)], True, color, 1)
+
+def draw_landmarks(frame, pts):
+    """Eye/iris landmark dots and eye outlines from a pixel-space landmark array."""
+    for x, y in eye_polygon(pts, LEFT_EYE + RIGHT_EYE + LEFT_IRIS).tolist():
+        cv2.circle(frame, (x, y), 2, (255, 255, 0), -1)
+
+    draw_eye_outline(frame, pts, LEFT_EYE)
+    draw_eye_outline(frame, pts, RIGHT_EYE)
+
+def text_panel_lines(values):
+    """
+    The overlay text as (text, origin, color) tuples.
+
+    Parameters:
+        values (dict): blinks, blink_rate, redness_label, pupil_diameter,
+            strain_level, health_score, avg_ear and optionally user_name
+    """
+    redness_label = values["redness_label"]
+    lines = [
+        (f"Blinks: {values['blinks']}", (20, 30), (0, 255, 0)),
+        (f"Blink Rate: {values['blink_rate']:.1f}/min", (20, 60), (255, 255, 255)),
+        (f"Redness: {redness_label}", (20, 90), (0, 0, 255) if redness_label == "HIGH" else (0, 255, 255)),
+        (f"Pupil Diam.: {values['pupil_diameter']:.2f}", (20, 120), (255, 0, 255)),
+        (f"Strain: {values['strain_level']}", (20, 140), (0, 200, 200)),
+        (f"Eye Health: {values['health_score']}/100", (20, 170), (255, 255, 0)),
+        (f"EAR: {values['avg_ear']:.3f}", (20, 200), (200, 200, 255)),
+    ]
+    if values.get("user_name"):
+        lines.append((f"User: {values['user_name']}", (20, 230), (0, 255, 255)))
+    return lines
+
+def draw_text_panel(frame, values):
+    for text, origin, color in text_panel_lines(values):
+        cv2.putText(frame, text, origin, FONT, 0.8, color, 2)
+
+class TextPanelLayer:
+    """
+    Cached rendering of the text panel.
+
+    Each line is rasterized once into a small mask and only re-rasterized
+    when its text or color changes. On every frame the cached masks are
+    stamped onto the frame with a masked copy. Most lines (blink count,
+    strain, score, user) change a few times a minute, so nearly all of the
+    putText work is skipped. With hard-edged (LINE_8) text the output is
+    identical to draw_text_panel. Builds that anti-alias text get the same
+    glyphs with hard edges.
+
+    With a `history` (TimeSeriesStore) the `smoothed` fields are shown as
+    their mean over the last `smooth_seconds` instead of the latest sample,
+    so the numbers are readable and their lines are re-rendered less often.
+    """
+
+    def __init__(self, font_scale=0.8, thickness=2, history=None, smoothed=("pupil_diameter",),
+                 smooth_seconds=2.0):
+        self.font_scale = font_scale
+        self.thickness = thickness
+        self.history = history
+        self.smoothed = smoothed
+        self.smooth_seconds = smooth_seconds
+        self._lines = {}  # origin -> (text, color, x0, y0, fill, mask)
+
+    def draw(self, frame, values):
+        if self.history is not None:
+            means = self.history.mean(self.smooth_seconds, self.smoothed)
+            values = dict(values, **{name: mean for name, mean in means.items() if mean is not None})
+        for text, origin, color in text_panel_lines(values):
+            cached = self._lines.get(origin)
+            if cached is None or cached[0] != text or cached[1] != color:
+                cached = self._lines[origin] = (text, color) + self._render(text, origin, color)
+            self._composite(frame, *cached[2:])
+
+    def _render(self, text, origin, color):
+        (text_w, text_h), baseline = cv2.getTextSize(text, FONT, self.font_scale, self.thickness)
+        pad = self.thickness + 2
+        x0, y0 = origin[0] - pad, origin[1] - text_h - pad
+        w, h = text_w + 2 * pad, text_h + baseline + 2 * pad
+        mask = np.zeros((h, w), dtype=np.uint8)
+        cv2.putText(mask, text, (origin[0] - x0, origin[1] - y0), FONT, self.font_scale, 255, self.thickness)
+        mask = (mask >= 128).astype(np.uint8)
+        fill = np.empty((h, w, 3), dtype=np.uint8)
+        fill[:] = color
+        return x0, y0, fill, mask
+
+    @staticmethod
+    def _composite(frame, x0, y0, fill, mask):
+        # Clip the patch to the frame for small resolutions
+        h, w = mask.shape
+        fx0, fy0 = max(x0, 0), max(y0, 0)
+        fx1, fy1 = min(x0 + w, frame.shape[1]), min(y0 + h, frame.shape[0])
+        if fx1 <= fx0 or fy1 <= fy0:
+            return
+        sx, sy = fx0 - x0, fy0 - y0
+        patch = np.s_[sy:sy + fy1 - fy0, sx:sx + fx1 - fx0]
+        cv2.copyTo(fill[patch], mask[patch], frame[fy0:fy1, fx0:fx1])
+
+def draw_timings(frame, lines):
+    """Stage timing lines (p50/p95/p99 ms) in small text along the bottom-left."""
+    y = frame.shape[0] - 10 - 16 * (len(lines) - 1)
+    for line in lines:
+        cv2.putText(frame, line, (10, y), FONT, 0.4, (180, 180, 180), 1)
+        y += 16
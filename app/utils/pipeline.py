@@ -0,0 +1,250 @@
+import threading
+import time
+from collections import deque
+
+import cv2
+
+from utils.profiling import NULL_PROFILER
+
+
+def parse_source(source):
+    """Camera index for digit strings ("0"), otherwise the file path or stream URL unchanged."""
+    return int(source) if str(source).isdigit() else source
+
+
+def is_live_source(source):
+    """Cameras and network streams run on wall-clock time; files have their own timeline."""
+    return isinstance(parse_source(source), int) or "://" in str(source)
+
+
+def open_capture(source):
+    cap = cv2.VideoCapture(parse_source(source))
+    if is_live_source(source):
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    return cap
+
+
+class DropOldestQueue:
+    """
+    Bounded FIFO between two pipeline stages.
+    When full, put() discards the oldest item instead of blocking the producer,
+    so a slow consumer always sees the freshest frames.
+    """
+
+    def __init__(self, maxsize=1):
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the oldest queued item, or None if nothing arrives within `timeout`."""
+        with self._cond:
+            if not self._items:
+                self._cond.wait(timeout)
+            if not self._items:
+                return None
+            return self._items.popleft()
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+
+class StageStats:
+    """Frame counter and busy time for one stage, reset on every report."""
+
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._frames = 0
+        self._busy = 0.0
+        self._since = time.perf_counter()
+
+    def tick(self, busy_seconds):
+        with self._lock:
+            self._frames += 1
+            self._busy += busy_seconds
+
+    def snapshot(self):
+        """Return (fps, avg_ms) since the previous snapshot and start a new window."""
+        with self._lock:
+            now = time.perf_counter()
+            elapsed = max(now - self._since, 1e-6)
+            fps = self._frames / elapsed
+            avg_ms = (self._busy / self._frames * 1000) if self._frames else 0.0
+            self._frames, self._busy, self._since = 0, 0.0, now
+        return fps, avg_ms
+
+
+class FramePacket:
+    """A captured frame travelling through the pipeline."""
+
+    __slots__ = ("frame", "captured_at", "seq", "landmarks")
+
+    def __init__(self, frame, captured_at, seq):
+        self.frame = frame
+        self.captured_at = captured_at
+        self.seq = seq
+        self.landmarks = None
+
+
+class CaptureStage(threading.Thread):
+    """
+    Reads the camera as fast as it delivers and keeps only the newest frame.
+    An exception stops the pipeline and is kept in `error`.
+    """
+
+    def __init__(self, cap, out_queue, stop_event, flip=True, profiler=NULL_PROFILER):
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.flip = flip
+        self.profiler = profiler
+        self.stats = StageStats("capture")
+        self.error = None
+
+    def run(self):
+        try:
+            self._capture()
+        except Exception as e:
+            self.error = e
+        finally:
+            self.stop_event.set()
+
+    def _capture(self):
+        seq = 0
+        while not self.stop_event.is_set() and self.cap.isOpened():
+            start = time.perf_counter()
+            with self.profiler.stage("capture"):
+                success, frame = self.cap.read()
+            if not success:
+                break
+            if self.flip:
+                with self.profiler.stage("flip"):
+                    frame = cv2.flip(frame, 1)
+            self.out_queue.put(FramePacket(frame, time.perf_counter(), seq))
+            seq += 1
+            self.stats.tick(time.perf_counter() - start)
+
+
+class ProcessingStage(threading.Thread):
+    """
+    Pulls packets from `in_queue`, applies `func`, pushes the result downstream.
+    If `func` raises, the pipeline is stopped and the exception kept in `error`.
+    """
+
+    def __init__(self, name, func, in_queue, out_queue, stop_event):
+        super().__init__(name=name, daemon=True)
+        self.func = func
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.stop_event = stop_event
+        self.stats = StageStats(name)
+        self.error = None
+
+    def run(self):
+        try:
+            self._process()
+        except Exception as e:
+            self.error = e
+            self.stop_event.set()
+
+    def _process(self):
+        while not self.stop_event.is_set():
+            packet = self.in_queue.get(timeout=0.1)
+            if packet is None:
+                continue
+            start = time.perf_counter()
+            packet = self.func(packet)
+            self.stats.tick(time.perf_counter() - start)
+            if packet is not None:
+                self.out_queue.put(packet)
+
+
+class FramePipeline:
+    """
+    capture thread -> [frames] -> inference thread -> [results] -> caller
+
+    Both queues are bounded and drop the oldest packet when full, so neither
+    the camera buffer nor the queues can build up latency. The final stage
+    (metrics, logging, rendering) runs on the caller's thread via next_packet(),
+    which keeps cv2.imshow on the main thread as HighGUI requires.
+
+    If a stage thread fails, the pipeline stops (`running` turns False once
+    the results are drained) and raise_error() re-raises the failure on the
+    caller's thread.
+    """
+
+    def __init__(self, cap, infer_func, queue_size=1, flip=True, profiler=NULL_PROFILER):
+        self.stop_event = threading.Event()
+        self.frame_queue = DropOldestQueue(queue_size)
+        self.result_queue = DropOldestQueue(queue_size)
+        self.capture = CaptureStage(cap, self.frame_queue, self.stop_event, flip=flip, profiler=profiler)
+        self.inference = ProcessingStage("inference", infer_func, self.frame_queue,
+                                         self.result_queue, self.stop_event)
+        self.render_stats = StageStats("render")
+        self.latency_ms = 0.0
+        self._render_start = None
+
+    def start(self):
+        self.capture.start()
+        self.inference.start()
+        return self
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set() or self.result_queue.qsize() > 0
+
+    def next_packet(self, timeout=0.1):
+        """Block for the next inferred packet; also closes the previous render timing."""
+        self._finish_render()
+        packet = self.result_queue.get(timeout=timeout)
+        if packet is not None:
+            self._render_start = time.perf_counter()
+        return packet
+
+    def frame_done(self, packet):
+        """Record end-to-end latency once the caller has finished with `packet`."""
+        self.latency_ms = (time.perf_counter() - packet.captured_at) * 1000
+        self._finish_render()
+
+    def _finish_render(self):
+        if self._render_start is not None:
+            self.render_stats.tick(time.perf_counter() - self._render_start)
+            self._render_start = None
+
+    @property
+    def error(self):
+        """The exception that stopped a stage thread, or None."""
+        return self.capture.error or self.inference.error
+
+    def raise_error(self):
+        if self.error is not None:
+            stage = "capture" if self.capture.error is not None else self.inference.name
+            raise RuntimeError(f"Pipeline {stage} stage failed: {self.error}") from self.error
+
+    def stop(self):
+        self.stop_event.set()
+        self.capture.join(timeout=1.0)
+        self.inference.join(timeout=1.0)
+
+    def report(self):
+        """One-line summary of per-stage FPS, busy time, queue depth and drops."""
+        parts = []
+        for stats in (self.capture.stats, self.inference.stats, self.render_stats):
+            fps, avg_ms = stats.snapshot()
+            parts.append(f"{stats.name} {fps:.1f}fps/{avg_ms:.1f}ms")
+        parts.append(f"q={self.frame_queue.qsize()}/{self.result_queue.qsize()}")
+        parts.append(f"drop={self.frame_queue.dropped}/{self.result_queue.dropped}")
+        parts.append(f"lat={self.latency_ms:.0f}ms")
+        return " | ".join(parts)
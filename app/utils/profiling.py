@@ -0,0 +1,162 @@
+import os
+import time
+
+import numpy as np
+
+
+class _RingBuffer:
+    """Fixed-size float64 ring of the most recent samples."""
+
+    __slots__ = ("values", "index", "count")
+
+    def __init__(self, capacity):
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.index = 0
+        self.count = 0
+
+    def push(self, value):
+        self.values[self.index] = value
+        self.index = (self.index + 1) % len(self.values)
+        if self.count < len(self.values):
+            self.count += 1
+
+    def samples(self):
+        return self.values[:self.count] if self.count < len(self.values) else self.values
+
+
+class _StageTimer:
+    """Reusable context manager for one stage; one instance per stage name."""
+
+    __slots__ = ("ring", "start")
+
+    def __init__(self, ring):
+        self.ring = ring
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.ring.push(time.perf_counter() - self.start)
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class StageProfiler:
+    """
+    Per-stage wall-clock timings with rolling p50/p95/p99.
+
+    Each stage keeps its latest `capacity` samples in a preallocated ring,
+    so memory stays fixed however long the session runs. Usage:
+
+        with profiler.stage("mesh"):
+            ...
+
+    Timers are cached per stage name and not shared between threads, so
+    each thread should time its own stages. When disabled, stage() returns
+    a shared no-op context manager and nothing is recorded.
+    """
+
+    def __init__(self, enabled=True, capacity=512):
+        self.enabled = enabled
+        self.capacity = capacity
+        self._rings = {}
+        self._timers = {}
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _StageTimer(self._ring(name))
+        return timer
+
+    def record(self, name, seconds):
+        """Add a sample measured elsewhere (e.g. by another component's own timer)."""
+        if self.enabled:
+            self._ring(name).push(seconds)
+
+    def _ring(self, name):
+        ring = self._rings.get(name)
+        if ring is None:
+            ring = self._rings[name] = _RingBuffer(self.capacity)
+        return ring
+
+    def percentiles(self):
+        """
+        Returns:
+            dict: stage -> {"n", "p50_ms", "p95_ms", "p99_ms"} in insertion order
+        """
+        out = {}
+        for name, ring in list(self._rings.items()):
+            samples = ring.samples()
+            if len(samples) == 0:
+                continue
+            p50, p95, p99 = (float(v) for v in np.percentile(samples, (50, 95, 99)) * 1000)
+            out[name] = {"n": ring.count, "p50_ms": p50, "p95_ms": p95, "p99_ms": p99}
+        return out
+
+    def overlay_lines(self):
+        """Short per-stage text lines for the video overlay."""
+        return [f"{name}: {p['p50_ms']:.1f}/{p['p95_ms']:.1f}/{p['p99_ms']:.1f} ms"
+                for name, p in self.percentiles().items()]
+
+    def log_rows(self, time_min):
+        """One long-format row per stage for the timings side log."""
+        return [{"time_min": time_min, "stage": name, "samples": p["n"],
+                 "p50_ms": p["p50_ms"], "p95_ms": p["p95_ms"], "p99_ms": p["p99_ms"]}
+                for name, p in self.percentiles().items()]
+
+
+NULL_PROFILER = StageProfiler(enabled=False)
+
+
+class StartupTimer:
+    """
+    Startup milestones, from process start to the first metric.
+
+    mark() keeps the seconds since `start` the first time a milestone is
+    reached; record() keeps a duration measured elsewhere, such as a model
+    loaded on another thread.
+    """
+
+    def __init__(self, start=None):
+        self.start = time.perf_counter() if start is None else start
+        self.marks = {}
+        self.durations = {}
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.start
+        return self.marks[name]
+
+    def record(self, name, seconds):
+        if seconds is not None:
+            self.durations[name] = seconds
+
+    def report(self):
+        parts = [f"{name} at {seconds:.2f}s" for name, seconds in self.marks.items()]
+        parts += [f"{name} took {seconds:.2f}s" for name, seconds in self.durations.items()]
+        return "Startup: " + " | ".join(parts)
+
+
+def timings_log_path(session_log_path):
+    """
+    Side log next to a session log: eye_health_log_X.csv -> eye_health_timing_X.csv.
+    Uses a different prefix so session-log globs don't pick it up.
+    """
+    folder, name = os.path.split(str(session_log_path))
+    return os.path.join(folder, name.replace("eye_health_log_", "eye_health_timing_", 1))
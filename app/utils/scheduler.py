@@ -0,0 +1,96 @@
+"""
+Per-metric cadences for the live loop.
+
+Blink detection needs every frame's EAR; redness, pupil diameter and the
+health score do not. Each metric declares how often it should run and the
+scheduler answers, per frame, which ones are due.
+"""
+import math
+
+FRAME = "frame"  # every frame
+LOG = "log"      # only on log ticks
+
+
+class WindowStats:
+    """Running mean/min/max of a metric since the last reset (one log window)."""
+
+    __slots__ = ("n", "total", "min", "max")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.n = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        self.n += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        return self.total / self.n if self.n else None
+
+    def summary(self, name):
+        """Log columns: <name> (window mean), <name>_min and <name>_max."""
+        if not self.n:
+            return {}
+        return {name: self.mean, f"{name}_min": self.min, f"{name}_max": self.max}
+
+
+class MetricScheduler:
+    """
+    Decides which metrics are due on a frame.
+
+    Each metric declares a cadence: FRAME (every frame), a rate in Hz, or
+    LOG (only on log ticks). Log ticks come every `log_interval` seconds,
+    and the first frame is always one. Rate-limited metrics are due on
+    their first frame and then at most `hz` times per second of the
+    timestamps passed in, so live, batch and replay runs schedule the same way.
+
+    Parameters:
+        cadences (dict): metric name -> FRAME, LOG or Hz (float)
+        log_interval (float): Seconds between log ticks
+    """
+
+    def __init__(self, cadences, log_interval):
+        for name, cadence in cadences.items():
+            if cadence not in (FRAME, LOG) and not (isinstance(cadence, (int, float)) and cadence > 0):
+                raise ValueError(f"Bad cadence for {name}: {cadence!r}")
+        self.cadences = dict(cadences)
+        self.log_interval = log_interval
+        self._next_due = {name: None for name, cadence in cadences.items() if cadence not in (FRAME, LOG)}
+        self._last_log = None
+
+    def is_log_tick(self, timestamp):
+        return self._last_log is None or timestamp - self._last_log >= self.log_interval
+
+    def due(self, timestamp):
+        """
+        Names of the metrics to compute for this frame. Call once per frame;
+        it advances the rate-limited metrics and the log tick.
+
+        Returns:
+            set: due metric names (LOG metrics only on log ticks)
+        """
+        log_tick = self.is_log_tick(timestamp)
+        if log_tick:
+            self._last_log = timestamp
+        due = set()
+        for name, cadence in self.cadences.items():
+            if cadence == FRAME or (cadence == LOG and log_tick):
+                due.add(name)
+            elif cadence != LOG:
+                next_due = self._next_due[name]
+                if next_due is None or timestamp >= next_due:
+                    due.add(name)
+                    self._next_due[name] = timestamp + 1.0 / cadence
+        if log_tick:
+            due.add(LOG)
+        return due
@@ -0,0 +1,213 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from utils.log_loading import read_log
+
+LOG_PATTERNS = ("eye_health_log_*.csv", "eye_health_log_*.parquet")
+STARTED_AT_RE = re.compile(r"eye_health_log_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})")
+# SessionLogger continues a session in <name>_part<N>[_<tag>] files (rotation, user splits)
+PART_RE = re.compile(r"_part(\d+)(?:_[^.]*)?$")
+STRAIN_LEVELS = {
+    "Low": "strain_low",
+    "Moderate": "strain_moderate",
+    "High": "strain_high",
+    "Insufficient Data": "strain_insufficient",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    path TEXT PRIMARY KEY,
+    session TEXT,
+    part INTEGER,
+    size INTEGER,
+    mtime_ns INTEGER,
+    started_at TEXT,
+    day TEXT,
+    week TEXT,
+    rows INTEGER,
+    duration_min REAL,
+    avg_blink_rate REAL,
+    avg_redness REAL,
+    avg_pupil_diameter REAL,
+    avg_health_score REAL,
+    final_health_score REAL,
+    strain_low INTEGER,
+    strain_moderate INTEGER,
+    strain_high INTEGER,
+    strain_insufficient INTEGER
+);
+"""
+
+# One row per log file; a session split across parts has one row per part.
+# Aggregates weight each part by its duration so short test runs don't dominate
+AGGREGATES = """
+       SUM(duration_min) AS duration_min,
+       SUM(avg_blink_rate * duration_min) / NULLIF(SUM(duration_min), 0) AS avg_blink_rate,
+       SUM(avg_redness * duration_min) / NULLIF(SUM(duration_min), 0) AS avg_redness,
+       SUM(avg_pupil_diameter * duration_min) / NULLIF(SUM(duration_min), 0) AS avg_pupil_diameter,
+       SUM(avg_health_score * duration_min) / NULLIF(SUM(duration_min), 0) AS avg_health_score,
+       SUM(strain_low) AS strain_low,
+       SUM(strain_moderate) AS strain_moderate,
+       SUM(strain_high) AS strain_high,
+       SUM(strain_insufficient) AS strain_insufficient"""
+
+ROLLUP_QUERY = f"""
+SELECT {{period}} AS period,
+       COUNT(DISTINCT session) AS sessions,{AGGREGATES}
+FROM sessions
+GROUP BY period
+ORDER BY period
+"""
+
+SESSIONS_QUERY = f"""
+SELECT session,
+       MIN(started_at) AS started_at,
+       MIN(day) AS day,
+       MIN(week) AS week,
+       COUNT(*) AS parts,
+       SUM(rows) AS rows,{AGGREGATES},
+       (SELECT final_health_score FROM sessions AS last WHERE last.session = sessions.session
+        ORDER BY part DESC LIMIT 1) AS final_health_score
+FROM sessions
+{{where}}
+GROUP BY session
+ORDER BY started_at
+"""
+
+
+def session_started_at(path):
+    """Session start from the log filename, falling back to the file's mtime."""
+    match = STARTED_AT_RE.search(Path(path).name)
+    if match:
+        return datetime.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S")
+    return datetime.fromtimestamp(os.path.getmtime(path))
+
+
+def session_part(path):
+    """
+    Session name and part number of a log file: eye_health_log_X_part3_bob.csv
+    -> ("eye_health_log_X", 3); the first file of a session is part 1.
+    """
+    stem = Path(path).stem
+    match = PART_RE.search(stem)
+    if match:
+        return stem[:match.start()], int(match.group(1))
+    return stem, 1
+
+
+def summarize_log(path):
+    """
+    Summary of one eye_health_log file, i.e. one part of a session.
+
+    The duration is the time this file covers (last minus first time_min),
+    so the parts of a split session add up to the session's length.
+
+    Returns:
+        dict: Column values for the sessions table (without size/mtime)
+    """
+    df = read_log(path)
+    started_at = session_started_at(path)
+    session, part = session_part(path)
+    strain_counts = df["strain_level"].value_counts() if "strain_level" in df else {}
+    summary = {
+        "path": str(path),
+        "session": session,
+        "part": part,
+        "started_at": started_at.isoformat(sep=" "),
+        "day": started_at.strftime("%Y-%m-%d"),
+        "week": started_at.strftime("%G-W%V"),
+        "rows": len(df),
+        "duration_min": float(df["time_min"].max() - df["time_min"].min()) if len(df) else 0.0,
+        "avg_blink_rate": float(df["blink_rate"].mean()) if len(df) else None,
+        "avg_redness": float(df["redness"].mean()) if len(df) else None,
+        "avg_pupil_diameter": float(df["pupil_diameter"].mean()) if len(df) else None,
+        "avg_health_score": float(df["health_score"].mean()) if len(df) else None,
+        "final_health_score": float(df["health_score"].iloc[-1]) if len(df) else None,
+    }
+    for level, column in STRAIN_LEVELS.items():
+        summary[column] = int(strain_counts.get(level, 0))
+    return summary
+
+
+class SessionCatalog:
+    """
+    SQLite index of every session log in a folder.
+
+    refresh() only re-summarizes logs whose size or mtime changed since the
+    last refresh and drops rows for deleted logs, so keeping the catalog up
+    to date costs one stat() per log plus a read of each new or growing one.
+    Trend views then query per-session summaries and daily/weekly rollups
+    instead of scanning raw CSVs.
+    """
+
+    def __init__(self, db_path, log_dir):
+        self.db_path = str(db_path)
+        self.log_dir = Path(log_dir)
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if columns and "session" not in columns:
+            # Catalog from before sessions were grouped by part; it is rebuilt from the logs
+            self._conn.execute("DROP TABLE sessions")
+        self._conn.executescript(SCHEMA)
+
+    def refresh(self):
+        """
+        Bring the catalog in line with the log folder.
+
+        Returns:
+            int: Number of logs (re)summarized
+        """
+        with self._lock:
+            known = {row["path"]: (row["size"], row["mtime_ns"])
+                     for row in self._conn.execute("SELECT path, size, mtime_ns FROM sessions")}
+            on_disk = set()
+            updated = 0
+            for pattern in LOG_PATTERNS:
+                for path in self.log_dir.glob(pattern):
+                    path = str(path)
+                    on_disk.add(path)
+                    stat = os.stat(path)
+                    signature = (stat.st_size, stat.st_mtime_ns)
+                    if known.get(path) == signature:
+                        continue
+                    try:
+                        summary = summarize_log(path)
+                    except Exception as e:
+                        print(f"Skipping log {path}: {e}")
+                        continue
+                    summary["size"], summary["mtime_ns"] = signature
+                    columns = ", ".join(summary)
+                    placeholders = ", ".join(f":{c}" for c in summary)
+                    self._conn.execute(f"INSERT OR REPLACE INTO sessions ({columns}) VALUES ({placeholders})", summary)
+                    updated += 1
+
+            removed = [(path,) for path in known if path not in on_disk]
+            self._conn.executemany("DELETE FROM sessions WHERE path = ?", removed)
+            self._conn.commit()
+            return updated
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params)]
+
+    def sessions(self, since=None):
+        """Per-session summaries with all parts combined, oldest first; `since` is a YYYY-MM-DD day."""
+        if since:
+            return self._query(SESSIONS_QUERY.format(where="WHERE day >= ?"), (since,))
+        return self._query(SESSIONS_QUERY.format(where=""))
+
+    def daily(self):
+        return self._query(ROLLUP_QUERY.format(period="day"))
+
+    def weekly(self):
+        return self._query(ROLLUP_QUERY.format(period="week"))
+
+    def close(self):
+        self._conn.close()
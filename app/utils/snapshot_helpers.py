@@ -1,14 +1,42 @@
 import os
 import cv2
+import numpy as np
 from datetime import datetime
 
+from vision.landmarks import eye_bbox
+
+def crop_eye_region(frame, landmarks, eye_indices, padding=10):
+    """
+    Crop the eye region based on landmarks, in memory.
+
+    Parameters:
+        frame (np.ndarray): The full video frame
+        landmarks (list | np.ndarray): Mediapipe facial landmarks, or a pixel-space
+            landmark array from vision.landmarks.landmarks_to_array
+        eye_indices (list): Landmark indices for cropping (e.g., LEFT_EYE + RIGHT_EYE)
+        padding (int): Margin around eyes
+
+    Returns:
+        eye_crop (np.ndarray): A copy of the region, safe to hand to another thread
+    """
+    h, w = frame.shape[:2]
+    if isinstance(landmarks, np.ndarray):
+        x_min, y_min, x_max, y_max = eye_bbox(landmarks, eye_indices, w, h, padding)
+    else:
+        xs = [int(landmarks[i].x * w) for i in eye_indices]
+        ys = [int(landmarks[i].y * h) for i in eye_indices]
+        x_min, x_max = max(min(xs) - padding, 0), min(max(xs) + padding, w)
+        y_min, y_max = max(min(ys) - padding, 0), min(max(ys) + padding, h)
+    return frame[y_min:y_max, x_min:x_max].copy()
+
 def crop_and_save_eye_snapshot(frame, landmarks, eye_indices, output_dir, filename_prefix="", padding=10):
     """
     Crop the eye region based on landmarks and save it as an image.
 
     Parameters:
         frame (np.ndarray): The full video frame
-        landmarks (list): Mediapipe facial landmarks
+        landmarks (list | np.ndarray): Mediapipe facial landmarks, or a pixel-space
+            landmark array from vision.landmarks.landmarks_to_array
         eye_indices (list): Landmark indices for cropping (e.g., LEFT_EYE + RIGHT_EYE)
         output_dir (str): Folder to save image
         filename_prefix (str): Optional prefix (e.g., user name or temp_)
@@ -17,13 +45,7 @@ def crop_and_save_eye_snapshot(frame, landmarks, eye_indices, output_dir, filena
     Returns:
         final_path (str): Path to saved image
     """
-    h, w = frame.shape[:2]
-    xs = [int(landmarks[i].x * w) for i in eye_indices]
-    ys = [int(landmarks[i].y * h) for i in eye_indices]
-    x_min, x_max = max(min(xs) - padding, 0), min(max(xs) + padding, w)
-    y_min, y_max = max(min(ys) - padding, 0), min(max(ys) + padding, h)
-
-    eye_crop = frame[y_min:y_max, x_min:x_max]
+    eye_crop = crop_eye_region(frame, landmarks, eye_indices, padding)
     os.makedirs(output_dir, exist_ok=True)
     timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     final_path = os.path.join(output_dir, f"{filename_prefix}{timestamp}.jpg")
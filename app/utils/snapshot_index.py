@@ -0,0 +1,178 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png"}
+# Snapshot names are <person>_<YYYY-MM-DD>[_HH-MM-SS].jpg; person names may contain underscores
+SNAPSHOT_NAME_RE = re.compile(r"^(?P<person>.+?)_(?P<date>\d{4}-\d{2}-\d{2})(?:_\d{2}-\d{2}-\d{2})?$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path TEXT PRIMARY KEY,
+    collection TEXT,
+    person TEXT,
+    name TEXT,
+    size INTEGER,
+    mtime_ns INTEGER,
+    thumb_mtime_ns INTEGER
+);
+CREATE INDEX IF NOT EXISTS images_person ON images (collection, person, mtime_ns);
+"""
+
+
+def person_from_snapshot(path):
+    match = SNAPSHOT_NAME_RE.match(Path(path).stem)
+    return match.group("person") if match else Path(path).stem
+
+
+class SnapshotIndex:
+    """
+    Persistent SQLite index of eye images with cached thumbnails.
+
+    Collections are either flat folders, where the person comes from the
+    file name (data/snapshots), or one subfolder per person
+    (data/face_training). refresh() does one scandir and one stat per image.
+    Only images whose size or mtime changed are re-indexed, and their
+    thumbnails are rebuilt in a background thread pool. The gallery then
+    reads one page of small thumbnails per person, and per-person counts
+    come from one query.
+
+    Parameters:
+        db_path (str): SQLite file (created if missing)
+        thumb_dir (str): Folder for thumbnail JPEGs
+        collections (dict): name -> (folder, by_folder)
+        thumb_size (int): Longest thumbnail side in pixels
+    """
+
+    def __init__(self, db_path, thumb_dir, collections, thumb_size=160, workers=2):
+        self.db_path = str(db_path)
+        self.thumb_dir = Path(thumb_dir)
+        self.collections = {name: (Path(folder), by_folder) for name, (folder, by_folder) in collections.items()}
+        self.thumb_size = thumb_size
+        os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+        self.thumb_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(SCHEMA)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumbnails")
+        self._pending = {}  # path -> Future of a thumbnail being built
+        self._pending_lock = threading.Lock()
+
+    def _scan(self, folder, by_folder):
+        """Yield (path, person, DirEntry) for every image in a collection folder."""
+        if not folder.is_dir():
+            return
+        if by_folder:
+            for person_dir in os.scandir(folder):
+                if person_dir.is_dir():
+                    for entry in os.scandir(person_dir.path):
+                        if Path(entry.name).suffix.lower() in IMAGE_EXTENSIONS:
+                            yield entry.path, person_dir.name, entry
+        else:
+            for entry in os.scandir(folder):
+                if Path(entry.name).suffix.lower() in IMAGE_EXTENSIONS:
+                    yield entry.path, person_from_snapshot(entry.name), entry
+
+    def refresh(self):
+        """
+        Bring the index in line with the folders and queue thumbnails for changed images.
+
+        Returns:
+            int: Number of images (re)indexed
+        """
+        with self._lock:
+            known = {row["path"]: (row["size"], row["mtime_ns"], row["thumb_mtime_ns"])
+                     for row in self._conn.execute("SELECT path, size, mtime_ns, thumb_mtime_ns FROM images")}
+            on_disk = set()
+            changed = []
+            for collection, (folder, by_folder) in self.collections.items():
+                for path, person, entry in self._scan(folder, by_folder):
+                    on_disk.add(path)
+                    stat = entry.stat()
+                    old = known.get(path)
+                    if old and old[:2] == (stat.st_size, stat.st_mtime_ns):
+                        if old[2] != stat.st_mtime_ns:
+                            self._queue_thumbnail(path, stat.st_mtime_ns)
+                        continue
+                    changed.append({"path": path, "collection": collection, "person": person,
+                                    "name": entry.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns})
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO images (path, collection, person, name, size, mtime_ns, thumb_mtime_ns) "
+                "VALUES (:path, :collection, :person, :name, :size, :mtime_ns, NULL)", changed)
+            removed = [path for path in known if path not in on_disk]
+            self._conn.executemany("DELETE FROM images WHERE path = ?", [(path,) for path in removed])
+            self._conn.commit()
+        for row in changed:
+            self._queue_thumbnail(row["path"], row["mtime_ns"])
+        for path in removed:
+            thumb = self.thumb_path(path)
+            if thumb.exists():
+                thumb.unlink()
+        return len(changed)
+
+    def thumb_path(self, path):
+        return self.thumb_dir / (hashlib.sha1(str(path).encode()).hexdigest() + ".jpg")
+
+    def _queue_thumbnail(self, path, mtime_ns):
+        with self._pending_lock:
+            future = self._pending.get(path)
+            if future is None or future.done():
+                self._pending[path] = self._pool.submit(self._build_thumbnail, path, mtime_ns)
+
+    def _build_thumbnail(self, path, mtime_ns):
+        # Runs on the thumbnail pool, so the dashboard's first render doesn't import cv2
+        import cv2
+        image = cv2.imread(path)
+        thumb = self.thumb_path(path)
+        if image is not None:
+            scale = min(self.thumb_size / max(image.shape[:2]), 1.0)
+            if scale < 1.0:
+                image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+            cv2.imwrite(str(thumb), image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        # Unreadable images are marked too, so they are not retried on every refresh
+        with self._lock:
+            self._conn.execute("UPDATE images SET thumb_mtime_ns = ? WHERE path = ?", (mtime_ns, path))
+            self._conn.commit()
+        return str(thumb) if image is not None else None
+
+    @property
+    def pending(self):
+        """Thumbnails still queued or being built."""
+        with self._pending_lock:
+            self._pending = {path: f for path, f in self._pending.items() if not f.done()}
+            return len(self._pending)
+
+    def thumbnail(self, path):
+        """
+        Thumbnail file for an indexed image, waiting for it if it is still
+        being built. Returns None for unreadable images.
+        """
+        with self._pending_lock:
+            future = self._pending.pop(path, None)
+        if future is not None:
+            return future.result()
+        thumb = self.thumb_path(path)
+        return str(thumb) if thumb.exists() else None
+
+    def people(self, collection):
+        """[(person, image_count)] for a collection, by name."""
+        with self._lock:
+            return [(row["person"], row["n"]) for row in self._conn.execute(
+                "SELECT person, COUNT(*) AS n FROM images WHERE collection = ? GROUP BY person ORDER BY person",
+                (collection,))]
+
+    def images(self, collection, person, offset=0, limit=12):
+        """One page of a person's images, newest first."""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(
+                "SELECT path, name, mtime_ns FROM images WHERE collection = ? AND person = ? "
+                "ORDER BY mtime_ns DESC, name LIMIT ? OFFSET ?", (collection, person, limit, offset))]
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        self._conn.close()
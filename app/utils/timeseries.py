@@ -0,0 +1,190 @@
+"""
+Bounded-memory history of the live metrics.
+
+A session can run all day on the glasses, so nothing here grows with
+session length: every resolution is a fixed-capacity NumPy ring. Raw
+samples are kept for the last few minutes, and each coarser tier keeps
+per-bucket means (e.g. 1 s buckets for an hour, 1 min buckets for a day).
+"""
+import math
+
+import numpy as np
+
+FIELDS = ("avg_ear", "blink_rate", "redness", "pupil_diameter", "health_score")
+RAW_SECONDS = 300
+RAW_RATE = 30  # samples per second the raw tier is sized for
+TIERS = ((1, 3600), (60, 86400))  # (bucket seconds, seconds kept)
+
+
+class _Ring:
+    """Fixed-capacity ring of rows (time + one column per field)."""
+
+    __slots__ = ("rows", "index", "count")
+
+    def __init__(self, capacity, width):
+        self.rows = np.full((capacity, width), np.nan, dtype=np.float64)
+        self.index = 0
+        self.count = 0
+
+    def push(self, row):
+        self.rows[self.index] = row
+        self.index = (self.index + 1) % len(self.rows)
+        if self.count < len(self.rows):
+            self.count += 1
+
+    def ordered(self):
+        """Rows oldest first (a copy once the ring has wrapped)."""
+        if self.count < len(self.rows):
+            return self.rows[:self.count]
+        return np.concatenate((self.rows[self.index:], self.rows[:self.index]))
+
+    def tail(self, n):
+        """The newest `n` rows (fewer if not that many yet), oldest first."""
+        n = min(n, self.count)
+        start = self.index - n
+        if start >= 0:
+            return self.rows[start:self.index]
+        return np.concatenate((self.rows[start:], self.rows[:self.index]))
+
+
+class _BucketTier:
+    """Means over `bucket`-second buckets, `span` seconds of them."""
+
+    __slots__ = ("bucket", "span", "ring", "key", "sums", "counts")
+
+    def __init__(self, bucket, span, n_fields):
+        self.bucket = bucket
+        self.span = span
+        self.ring = _Ring(int(math.ceil(span / bucket)), n_fields + 1)
+        self.key = None
+        self.sums = np.zeros(n_fields)
+        self.counts = np.zeros(n_fields)
+
+    def add(self, timestamp, values):
+        key = math.floor(timestamp / self.bucket)
+        if key != self.key:
+            self.flush()
+            self.key = key
+        present = ~np.isnan(values)
+        self.sums[present] += values[present]
+        self.counts[present] += 1
+
+    def flush(self):
+        if self.key is None or not self.counts.any():
+            return
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self.sums / self.counts
+        self.ring.push(np.concatenate(([self.key * self.bucket], means)))
+        self.sums[:] = 0
+        self.counts[:] = 0
+
+    def rows(self):
+        """Closed buckets oldest first, plus the open one."""
+        rows = self.ring.ordered()
+        if self.key is None or not self.counts.any():
+            return rows
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pending = np.concatenate(([self.key * self.bucket], self.sums / self.counts))
+        return np.vstack((rows, pending))
+
+
+class TimeSeriesStore:
+    """
+    Multi-resolution history of per-frame metrics with flat memory use.
+
+    Parameters:
+        fields (tuple): Metric names kept per sample; missing values are NaN
+        raw_seconds (float): How long raw samples are kept
+        raw_rate (float): Sample rate the raw ring is sized for; faster input keeps less time
+        tiers (tuple): (bucket seconds, seconds kept) per downsampled tier, finest first
+    """
+
+    def __init__(self, fields=FIELDS, raw_seconds=RAW_SECONDS, raw_rate=RAW_RATE, tiers=TIERS):
+        self.fields = tuple(fields)
+        self._columns = {name: i + 1 for i, name in enumerate(self.fields)}
+        self.raw_rate = raw_rate
+        self._raw = _Ring(int(math.ceil(raw_seconds * raw_rate)), len(self.fields) + 1)
+        self._tiers = [_BucketTier(bucket, span, len(self.fields)) for bucket, span in tiers]
+        self._row = np.empty(len(self.fields) + 1)
+        self.samples = 0
+
+    def add(self, timestamp, values):
+        """Record one sample; `values` is a dict (e.g. EyeSession.latest) with any of the fields."""
+        row = self._row
+        row[0] = timestamp
+        for name, column in self._columns.items():
+            value = values.get(name)
+            row[column] = np.nan if value is None else value
+        self._raw.push(row)
+        for tier in self._tiers:
+            tier.add(timestamp, row[1:])
+        self.samples += 1
+
+    def latest(self):
+        """The most recent raw sample as a dict, or None."""
+        if not self._raw.count:
+            return None
+        row = self._raw.rows[self._raw.index - 1]
+        return {"time": float(row[0]), **{name: float(row[c]) for name, c in self._columns.items()}}
+
+    def mean(self, seconds, fields=None):
+        """
+        Mean of each field over the past `seconds` of raw samples, skipping
+        missing values. Cheap enough to call every frame: only the newest
+        `seconds * raw_rate` rows are looked at.
+
+        Returns:
+            dict: field -> mean, or None if nothing was recorded in the window
+        """
+        rows = self._raw.tail(int(math.ceil(seconds * self.raw_rate)))
+        if len(rows):
+            rows = rows[rows[:, 0] >= rows[-1, 0] - seconds]
+        means = {}
+        for name in (self.fields if fields is None else fields):
+            column = rows[:, self._columns[name]]
+            present = column[~np.isnan(column)]
+            means[name] = float(present.mean()) if len(present) else None
+        return means
+
+    def table(self, seconds=None):
+        """
+        Every field over the past `seconds` (default: all kept).
+
+        Uses the finest resolution that still covers the requested span: raw
+        samples, then each bucket tier in turn; the open bucket is included.
+
+        Returns:
+            dict: "time" and each field -> 1-D float64 array, oldest first
+        """
+        rows = self._rows_covering(seconds)
+        if seconds is not None and len(rows):
+            rows = rows[rows[:, 0] >= rows[-1, 0] - seconds]
+        table = {"time": rows[:, 0].copy()}
+        table.update((name, rows[:, c].copy()) for name, c in self._columns.items())
+        return table
+
+    def series(self, field, seconds=None):
+        """
+        History of one field, as table() picks it.
+
+        Returns:
+            tuple: (times, values) as 1-D float64 arrays, oldest first
+        """
+        table = self.table(seconds)
+        return table["time"], table[field]
+
+    def _rows_covering(self, seconds):
+        raw = self._raw.ordered()
+        if self._raw.count < len(self._raw.rows) or not self._tiers:
+            return raw  # raw still holds the whole session
+        if seconds is not None and raw[-1, 0] - raw[0, 0] >= seconds:
+            return raw
+        for tier in self._tiers:
+            if seconds is not None and seconds <= tier.span:
+                break
+        return tier.rows()
+
+    @property
+    def nbytes(self):
+        """Memory held by the rings; fixed at construction."""
+        return self._raw.rows.nbytes + sum(tier.ring.rows.nbytes for tier in self._tiers)
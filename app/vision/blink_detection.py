@@ -1,34 +1,153 @@
+import math
 import time
 from collections import deque
 
+import numpy as np
+
+from vision.landmarks import eye_aspect_ratio, eye_aspect_ratios
+
+
+class BlinkWindowCounter:
+    """
+    Blink timestamps over several sliding windows at once.
+
+    Each window keeps its own deque and evicts from the left as timestamps
+    age out, so adding a blink and counting a window are amortized O(1)
+    however often people blink. Inter-blink intervals and blink durations
+    are kept with running sums over the largest window.
+    """
+
+    def __init__(self, windows=(60, 300)):
+        self.windows = tuple(sorted(set(windows)))
+        self.max_window = self.windows[-1]
+        self._events = {w: deque() for w in self.windows}
+        # (timestamp, interval, duration) over the largest window
+        self._details = deque()
+        self._sums = [0.0, 0.0, 0.0, 0.0]  # interval, interval^2, duration, duration^2
+        self._interval_count = 0
+        self.last_blink = None
+        self.last_interval = None
+        self.last_duration = None
+
+    def add(self, timestamp, duration=0.0):
+        interval = None if self.last_blink is None else timestamp - self.last_blink
+        for events in self._events.values():
+            events.append(timestamp)
+        self._details.append((timestamp, interval, duration))
+        self._push_stats(interval, duration, 1)
+        self.last_blink, self.last_interval, self.last_duration = timestamp, interval, duration
+        self.evict(timestamp)
+
+    def _push_stats(self, interval, duration, sign):
+        if interval is not None:
+            self._sums[0] += sign * interval
+            self._sums[1] += sign * interval * interval
+            self._interval_count += sign
+        self._sums[2] += sign * duration
+        self._sums[3] += sign * duration * duration
+
+    def evict(self, now):
+        for window, events in self._events.items():
+            while events and now - events[0] > window:
+                events.popleft()
+        while self._details and now - self._details[0][0] > self.max_window:
+            _, interval, duration = self._details.popleft()
+            self._push_stats(interval, duration, -1)
+
+    def count(self, window, now):
+        """Blinks within the past `window` seconds of `now`."""
+        self.evict(now)
+        if window in self._events:
+            return len(self._events[window])
+        # Unconfigured window: scan the largest one (only exact up to max_window)
+        return sum(1 for t in self._events[self.max_window] if now - t <= window)
+
+    def counts(self, now):
+        """Counts for every configured window, e.g. {60: 12, 300: 51}."""
+        self.evict(now)
+        return {w: len(events) for w, events in self._events.items()}
+
+    def timestamps(self):
+        """Blink timestamps within the largest window, oldest first."""
+        return self._events[self.max_window]
+
+    @staticmethod
+    def _mean_std(total, total_sq, n):
+        if n <= 0:
+            return None, None
+        mean = total / n
+        return mean, math.sqrt(max(total_sq / n - mean * mean, 0.0))
+
+    def stats(self, now):
+        """Inter-blink interval and blink duration stats over the largest window."""
+        self.evict(now)
+        n = len(self._details)
+        interval_mean, interval_std = self._mean_std(self._sums[0], self._sums[1], self._interval_count)
+        duration_mean, duration_std = self._mean_std(self._sums[2], self._sums[3], n)
+        return {
+            "window": self.max_window,
+            "blinks": n,
+            "interval_mean": interval_mean,
+            "interval_std": interval_std,
+            "last_interval": self.last_interval,
+            "duration_mean": duration_mean,
+            "duration_std": duration_std,
+            "last_duration": self.last_duration,
+        }
+
+
 class BlinkDetector:
-    def __init__(self, eye_closed_thresh=0.30, consec_frames=3):
+    def __init__(self, eye_closed_thresh=0.30, consec_frames=3, windows=(60, 300), clock=time.monotonic):
         self.eye_closed_thresh = eye_closed_thresh
         self.consec_frames = consec_frames
         self.closed_frames = 0
+        self.closed_since = None
         self.blink_counter = 0
-        self.blink_log = deque(maxlen=300)  # Timestamps of detected blinks
+        self.clock = clock
+        self.blink_windows = BlinkWindowCounter(windows)
+        self.blink_log = self.blink_windows.timestamps()  # Timestamps of detected blinks (largest window)
+
+    def now(self):
+        return self.clock()
 
     def euclidean(self, p1, p2):
         return ((p1.x - p2.x)**2 + (p1.y - p2.y)**2) ** 0.5
 
     def calculate_ear(self, landmarks, eye_indices):
         # EAR = (||p2-p6|| + ||p3-p5||) / (2 * ||p1-p4||)
-        top = (self.euclidean(landmarks[eye_indices[1]], landmarks[eye_indices[5]]) +
-               self.euclidean(landmarks[eye_indices[2]], landmarks[eye_indices[4]]))
-        hor = self.euclidean(landmarks[eye_indices[0]], landmarks[eye_indices[3]])
-        return (top / 2) / hor if hor != 0 else 0
+        # Thin wrapper over the array version for Mediapipe landmark objects
+        eye = np.array([(landmarks[i].x, landmarks[i].y) for i in eye_indices], dtype=np.float32)
+        return eye_aspect_ratio(eye, range(len(eye_indices)))
+
+    def calculate_ears(self, pts):
+        # Left and right EAR from a landmark array (see vision.landmarks)
+        left_ear, right_ear = eye_aspect_ratios(pts)
+        return float(left_ear), float(right_ear)
 
-    def update(self, avg_ear):
+    def update(self, avg_ear, timestamp=None):
+        # `timestamp` lets recorded streams be replayed on their own clock
+        if timestamp is None:
+            timestamp = self.clock()
         if avg_ear < self.eye_closed_thresh:
+            if self.closed_frames == 0:
+                self.closed_since = timestamp
             self.closed_frames += 1
         else:
             if self.closed_frames >= self.consec_frames:
                 self.blink_counter += 1
-                self.blink_log.append(time.time())
+                self.blink_windows.add(timestamp, duration=timestamp - self.closed_since)
             self.closed_frames = 0
 
-    def get_blink_rate(self, window=60):
+    def get_blink_rate(self, window=60, current_time=None):
         # Returns the number of blinks detected within the past 'window' seconds
-        current_time = time.time()
-        return len([t for t in self.blink_log if current_time - t <= window])
+        if current_time is None:
+            current_time = self.clock()
+        return self.blink_windows.count(window, current_time)
+
+    def get_blink_counts(self, current_time=None):
+        # Blink counts for every configured window at once
+        return self.blink_windows.counts(self.clock() if current_time is None else current_time)
+
+    def get_blink_stats(self, current_time=None):
+        # Inter-blink interval and blink duration stats over the largest window
+        return self.blink_windows.stats(self.clock() if current_time is None else current_time)
@@ -0,0 +1,34 @@
+from vision.landmarks import LEFT_EYE, LEFT_IRIS, to_normalized, eye_aspect_ratios, eye_polygon, iris_diameter
+from vision.redness_detection import calc_redness
+from utils.profiling import NULL_PROFILER
+
+EYE_METRICS = ("redness", "pupil_diameter")
+
+
+def measure_eyes(frame, pts, profiler=NULL_PROFILER, metrics=EYE_METRICS):
+    """
+    Per-frame measurements shared by the live app and batch analysis.
+
+    Parameters:
+        frame (np.ndarray): BGR frame the landmarks were detected on
+        pts (np.ndarray): (478, 2) pixel-space landmark array
+        profiler (StageProfiler): Receives "ear", "redness" and "pupil" timings
+        metrics (iterable): Which of EYE_METRICS to measure; EAR is always measured
+
+    Returns:
+        dict: avg_ear plus the requested redness and/or pupil_diameter
+    """
+    img_h, img_w = frame.shape[:2]
+    # EAR threshold and logged pupil units were tuned on normalized coordinates
+    norm_pts = to_normalized(pts, img_w, img_h)
+    with profiler.stage("ear"):
+        left_ear, right_ear = eye_aspect_ratios(norm_pts)
+    measured = {"avg_ear": float(left_ear + right_ear) / 2}
+    if "redness" in metrics:
+        with profiler.stage("redness"):
+            left_eye_pts = [tuple(p) for p in eye_polygon(pts, LEFT_EYE).tolist()]
+            measured["redness"] = calc_redness(frame, left_eye_pts)
+    if "pupil_diameter" in metrics:
+        with profiler.stage("pupil"):
+            measured["pupil_diameter"] = iris_diameter(norm_pts, LEFT_IRIS)
+    return measured
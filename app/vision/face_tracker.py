@@ -0,0 +1,193 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from vision.landmarks import EYE_AND_IRIS, landmarks_to_array
+from utils.profiling import NULL_PROFILER
+
+# Landmarks that drive the metrics; these are the ones optical flow follows
+TRACKED_POINTS = np.array(EYE_AND_IRIS)
+
+LK_PARAMS = dict(winSize=(15, 15), maxLevel=2,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+
+class TrackedFaceMesh:
+    """
+    FaceMesh that only looks at the whole frame on keyframes.
+
+    Between keyframes the last face is followed in one of two ways:
+      - "roi": FaceMesh runs on a crop around the last face box, downscaled
+        so its longest side is `roi_size` pixels. Landmarks are mapped back
+        to full-frame pixels. This keeps per-frame eyelid detail for blinks.
+      - "flow": only the eye and iris landmarks are propagated with
+        Lucas-Kanade optical flow, and the rest of the mesh is shifted by
+        their median motion. This is the cheapest option.
+
+    Tracking falls back to a full detection when the ROI loses the face,
+    the face box jumps in size, or the flow's forward-backward error grows.
+    The keyframe interval adapts between `min_interval` and `max_interval`
+    to hold `target_fps`: it grows when frames run slow and shrinks when
+    there is headroom.
+
+    The FaceMesh instances are created by load(), which process() calls on
+    the first frame. Calling load() early from another thread overlaps the
+    model load with other startup work such as opening the camera.
+
+    Parameters:
+        create_face_mesh (callable): Returns a new mp FaceMesh instance; only called by load()
+        mode (str): "roi", "flow" or "full" (no tracking)
+        profiler (StageProfiler): Receives "color", "mesh", "mesh_roi" and "flow" timings
+    """
+
+    def __init__(self, create_face_mesh, mode="roi", target_fps=15.0, min_interval=1, max_interval=15,
+                 roi_margin=0.25, roi_size=256, max_flow_error=1.5, profiler=NULL_PROFILER):
+        if mode not in ("roi", "flow", "full"):
+            raise ValueError(f"Unknown tracking mode: {mode}")
+        self.mode = mode
+        self.create_face_mesh = create_face_mesh
+        self.full_mesh = None
+        self.roi_mesh = None
+        self.load_seconds = None
+        self._load_lock = threading.Lock()
+        self.target_fps = target_fps
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.keyframe_interval = min_interval
+        self.roi_margin = roi_margin
+        self.roi_size = roi_size
+        self.max_flow_error = max_flow_error
+        self.profiler = profiler
+
+        self.last_kind = None  # "full", "roi" or "flow" for the latest frame
+        self.fallbacks = 0
+        self._pts = None
+        self._prev_gray = None
+        self._since_keyframe = 0
+        self._frame_time = None
+
+    def load(self):
+        """Create the FaceMesh instances if not done yet; safe to call from any thread."""
+        with self._load_lock:
+            if self.full_mesh is None:
+                start = time.perf_counter()
+                # full_mesh is set last: process() only takes the lock while it is None
+                self.roi_mesh = self.create_face_mesh() if self.mode == "roi" else None
+                self.full_mesh = self.create_face_mesh()
+                self.load_seconds = time.perf_counter() - start
+        return self
+
+    def process(self, frame):
+        """
+        Landmarks for one BGR frame.
+
+        Returns:
+            np.ndarray | None: (478, 2) pixel-space landmarks, None if no face
+        """
+        if self.full_mesh is None:
+            self.load()
+        start = time.perf_counter()
+        gray = None
+        if self.mode == "flow":
+            with self.profiler.stage("color"):
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+        pts = None
+        if (self.mode != "full" and self._pts is not None
+                and self._since_keyframe < self.keyframe_interval):
+            pts = self._track_roi(frame) if self.mode == "roi" else self._track_flow(gray)
+            if pts is None:
+                self.fallbacks += 1
+            else:
+                self._since_keyframe += 1
+        if pts is None:
+            pts = self._detect_full(frame)
+            self.last_kind = "full"
+            self._since_keyframe = 1
+
+        self._pts = pts
+        self._prev_gray = gray
+        self._adapt_interval(time.perf_counter() - start)
+        return pts
+
+    def _detect_full(self, frame):
+        with self.profiler.stage("color"):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with self.profiler.stage("mesh"):
+            results = self.full_mesh.process(rgb)
+        if not results.multi_face_landmarks:
+            return None
+        img_h, img_w = frame.shape[:2]
+        return landmarks_to_array(results.multi_face_landmarks[0].landmark, img_w, img_h)
+
+    def _track_roi(self, frame):
+        img_h, img_w = frame.shape[:2]
+        (x_min, y_min), (x_max, y_max) = self._pts.min(axis=0), self._pts.max(axis=0)
+        box_w, box_h = x_max - x_min, y_max - y_min
+        x0 = int(max(x_min - box_w * self.roi_margin, 0))
+        y0 = int(max(y_min - box_h * self.roi_margin, 0))
+        x1 = int(min(x_max + box_w * self.roi_margin, img_w))
+        y1 = int(min(y_max + box_h * self.roi_margin, img_h))
+        if x1 - x0 < 16 or y1 - y0 < 16:
+            return None
+
+        crop = frame[y0:y1, x0:x1]
+        scale = min(self.roi_size / max(crop.shape[:2]), 1.0)
+        if scale < 1.0:
+            crop = cv2.resize(crop, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        with self.profiler.stage("color"):
+            rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB)
+        with self.profiler.stage("mesh_roi"):
+            results = self.roi_mesh.process(rgb)
+        if not results.multi_face_landmarks:
+            return None
+
+        pts = landmarks_to_array(results.multi_face_landmarks[0].landmark, x1 - x0, y1 - y0)
+        pts += (x0, y0)
+        # A face box that suddenly shrinks or grows means the crop latched onto something else
+        new_w = pts[:, 0].max() - pts[:, 0].min()
+        if not 0.6 < new_w / max(box_w, 1.0) < 1.6:
+            return None
+        self.last_kind = "roi"
+        return pts
+
+    def _track_flow(self, gray):
+        if self._prev_gray is None:
+            return None
+        p0 = self._pts[TRACKED_POINTS].reshape(-1, 1, 2).astype(np.float32)
+        with self.profiler.stage("flow"):
+            p1, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, p0, None, **LK_PARAMS)
+            if p1 is None or not status.all():
+                return None
+            # Forward-backward check: points that don't track back to where they started are unreliable
+            p0_back, status_back, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, p1, None, **LK_PARAMS)
+        if p0_back is None or not status_back.all():
+            return None
+        error = np.linalg.norm((p0 - p0_back).reshape(-1, 2), axis=1)
+        if np.median(error) > self.max_flow_error:
+            return None
+
+        moved = p1.reshape(-1, 2)
+        pts = self._pts + np.median(moved - p0.reshape(-1, 2), axis=0)
+        pts[TRACKED_POINTS] = moved
+        self.last_kind = "flow"
+        return pts
+
+    def _adapt_interval(self, seconds):
+        self._frame_time = seconds if self._frame_time is None else 0.9 * self._frame_time + 0.1 * seconds
+        if self.mode == "full":
+            return
+        budget = 1.0 / self.target_fps
+        if self._frame_time > budget and self.keyframe_interval < self.max_interval:
+            self.keyframe_interval += 1
+        elif self._frame_time < 0.7 * budget and self.keyframe_interval > self.min_interval:
+            self.keyframe_interval -= 1
+
+    def close(self):
+        if self.full_mesh is None:
+            return
+        self.full_mesh.close()
+        if self.roi_mesh is not None:
+            self.roi_mesh.close()
@@ -1,5 +1,14 @@
 import time
 
+def strain_level_from_count(blink_count):
+    """Map the number of blinks in the strain window to "Low", "Moderate" or "High"."""
+    if blink_count >= 40:
+        return "Low"
+    elif 20 <= blink_count < 40:
+        return "Moderate"
+    else:
+        return "High"
+
 def compute_strain_level(blink_log, current_time, window=300):
     """
     Computes an eye strain level based on the blink count in the past `window` seconds.
@@ -12,16 +21,11 @@ def compute_strain_level(blink_log, current_time, window=300):
     Returns:
       str: A strain level label: "Low", "Moderate", or "High".
     """
-    recent_blinks = [t for t in blink_log if current_time - t <= window]
-    blink_count = len(recent_blinks)
-    if blink_count >= 40:
-        return "Low"
-    elif 20 <= blink_count < 40:
-        return "Moderate"
-    else:
-        return "High"
+    blink_count = sum(1 for t in blink_log if current_time - t <= window)
+    return strain_level_from_count(blink_count)
 
-def compute_eye_health_score(blink_rate, redness, blink_log, elapsed_time, baseline_blink_rate=8):
+def compute_eye_health_score(blink_rate, redness, blink_log, elapsed_time, baseline_blink_rate=8, current_time=None,
+                             recent_blink_count=None, redness_threshold=0.05):
     """
     Compute an overall eye health score (0-100) based on:
       - Blink rate: Expecting around 8 blinks per minute as baseline.
@@ -37,6 +41,10 @@ def compute_eye_health_score(blink_rate, redness, blink_log, elapsed_time, basel
       blink_log (deque): Timestamps of detected blinks.
       elapsed_time (float): Time in seconds since the software started.
       baseline_blink_rate (float): Expected healthy blink rate (default 8 blinks/min).
+      current_time (float): Clock the blink_log timestamps are on (default: time.time()).
+      recent_blink_count (int): Blinks in the past 300 s if already known
+        (e.g. BlinkDetector.get_blink_rate(300)); skips scanning blink_log.
+      redness_threshold (float): Redness above which the penalty starts (default 0.05).
       
     Returns:
       tuple: (score, strain) where score is between 0 and 100 and strain is a string label.
@@ -53,13 +61,17 @@ def compute_eye_health_score(blink_rate, redness, blink_log, elapsed_time, basel
         score -= blink_penalty
 
     # Penalize for redness if it exceeds the threshold (0.05).
-    if redness > 0.05:
-        redness_penalty = 25 * ((redness - 0.05) / 0.05)
+    if redness > redness_threshold:
+        redness_penalty = 25 * ((redness - redness_threshold) / redness_threshold)
         score -= redness_penalty
 
     # Compute strain level from the blink log over the past 5 minutes (300 sec).
-    current_time = time.time()
-    strain = compute_strain_level(blink_log, current_time, window=300)
+    if recent_blink_count is not None:
+        strain = strain_level_from_count(recent_blink_count)
+    else:
+        if current_time is None:
+            current_time = time.time()
+        strain = compute_strain_level(blink_log, current_time, window=300)
     if strain == "Moderate":
         score -= 10
     elif strain == "High":
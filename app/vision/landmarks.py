@@ -0,0 +1,109 @@
+from operator import attrgetter
+
+import numpy as np
+
+# Mediapipe FaceMesh landmark indices (refine_landmarks=True gives 478 points)
+NUM_LANDMARKS = 478
+LEFT_EYE = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+LEFT_IRIS = [468, 469, 470, 471, 472]
+RIGHT_IRIS = [473, 474, 475, 476, 477]
+BOTH_EYES = np.array([LEFT_EYE, RIGHT_EYE])
+EYE_AND_IRIS = LEFT_EYE + RIGHT_EYE + LEFT_IRIS + RIGHT_IRIS  # every point the eye metrics use
+
+_X, _Y, _Z = attrgetter("x"), attrgetter("y"), attrgetter("z")
+
+
+def landmarks_to_array(landmarks, img_w=1, img_h=1, with_z=False, indices=None):
+    """
+    Convert a Mediapipe landmark list into a float32 array.
+
+    Each coordinate is read with one C-level map() pass over the list, so
+    no Python code runs per landmark; this is on the per-frame path.
+
+    Parameters:
+        landmarks (list): Mediapipe facial landmarks (objects with .x/.y/.z)
+        img_w, img_h (int): Frame size; leave at 1 to keep normalized coordinates
+        with_z (bool): Return (N, 3) instead of (N, 2)
+        indices (list): Only read these landmarks (e.g. EYE_AND_IRIS); the
+            array keeps its full size and the others are NaN
+
+    Returns:
+        np.ndarray: (N, 2) or (N, 3) float32 array, x/y scaled to pixel space
+    """
+    n = len(landmarks)
+    width = 3 if with_z else 2
+    if indices is None:
+        pts, rows, picked = np.empty((n, width), dtype=np.float32), slice(None), landmarks
+    else:
+        pts, rows = np.full((n, width), np.nan, dtype=np.float32), indices
+        picked = [landmarks[i] for i in indices]
+    for column, (getter, scale) in enumerate(((_X, img_w), (_Y, img_h), (_Z, 1))[:width]):
+        values = np.fromiter(map(getter, picked), dtype=np.float32, count=len(picked))
+        pts[rows, column] = values * scale if scale != 1 else values
+    return pts
+
+
+def to_normalized(pts, img_w, img_h):
+    """Map a pixel-space array back to Mediapipe's normalized [0, 1] coordinates."""
+    return pts[..., :2] * np.array([1.0 / img_w, 1.0 / img_h], dtype=np.float32)
+
+
+# EAR point pairs within an eye: the two vertical distances, then the horizontal one
+_EAR_FROM = np.array([1, 2, 0])
+_EAR_TO = np.array([5, 4, 3])
+
+
+def _ratio(num, den):
+    # np.divide's `where` skips zero denominators without an errstate context,
+    # which costs more than the division itself on a single frame
+    out = np.zeros(np.shape(num), dtype=np.result_type(num, den))
+    np.divide(num, den, out=out, where=den != 0)
+    return float(out) if out.ndim == 0 else out
+
+
+def _ear(eye):
+    # eye: (..., 6, 2) points ordered as in LEFT_EYE / RIGHT_EYE
+    d = eye[..., _EAR_FROM, :] - eye[..., _EAR_TO, :]
+    dist = np.sqrt(np.einsum("...i,...i->...", d, d))
+    return _ratio((dist[..., 0] + dist[..., 1]) / 2, dist[..., 2])
+
+
+def eye_aspect_ratio(pts, eye_indices):
+    """
+    EAR = (||p2-p6|| + ||p3-p5||) / (2 * ||p1-p4||)
+
+    `pts` may be a single frame (N, 2) or a batch (T, N, 2); the result is a
+    float or a (T,) array respectively.
+    """
+    return _ear(pts[..., eye_indices, :2])
+
+
+def eye_aspect_ratios(pts, eyes=BOTH_EYES):
+    """EAR for several eyes at once; returns (..., len(eyes)), left then right by default."""
+    return _ear(pts[..., eyes, :2])
+
+
+def iris_diameter(pts, iris_indices=LEFT_IRIS):
+    """Distance between iris landmarks [0] and [2], for one frame or a batch."""
+    d = np.linalg.norm(pts[..., iris_indices[0], :2] - pts[..., iris_indices[2], :2], axis=-1)
+    return float(d) if d.ndim == 0 else d
+
+
+def eye_polygon(pts, eye_indices):
+    """Integer pixel polygon (K, 2) for cv2 drawing and masking."""
+    return pts[eye_indices, :2].astype(np.int32)
+
+
+def eye_bbox(pts, eye_indices, img_w, img_h, padding=0):
+    """
+    Padded bounding box of the given landmarks, clamped to the frame.
+
+    Returns:
+        tuple: (x_min, y_min, x_max, y_max) in integer pixels
+    """
+    poly = eye_polygon(pts, eye_indices)
+    x_min, y_min = poly.min(axis=0)
+    x_max, y_max = poly.max(axis=0)
+    return (max(int(x_min) - padding, 0), max(int(y_min) - padding, 0),
+            min(int(x_max) + padding, img_w), min(int(y_max) + padding, img_h))
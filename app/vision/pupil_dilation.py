@@ -1,3 +1,6 @@
+from vision.landmarks import LEFT_IRIS, iris_diameter
+
+
 def calculate_pupil_diameter(landmarks, iris_indices, euclidean):
     """
     Estimate pupil (or iris) diameter from the refined iris landmarks.
@@ -6,3 +9,11 @@ def calculate_pupil_diameter(landmarks, iris_indices, euclidean):
     left_point = landmarks[iris_indices[0]]  # e.g., index 468
     right_point = landmarks[iris_indices[2]]  # e.g., index 472
     return euclidean(left_point, right_point)
+
+
+def calculate_pupil_diameter_array(pts, iris_indices=LEFT_IRIS):
+    """
+    Same measurement as calculate_pupil_diameter, taken from a landmark array
+    of shape (478, 2) or a batch (T, 478, 2).
+    """
+    return iris_diameter(pts, iris_indices)
@@ -1,17 +1,90 @@
 import numpy as np
 import cv2
 
+from vision.landmarks import BOTH_EYES
+
+# Channel 0 of the BGR frame is what calc_redness has always thresholded
+# (cv2.split returns B, G, R), and every logged redness value is on that scale.
+REDNESS_CHANNEL = 0
+REDNESS_LEVEL = 150
+
 def calc_redness(frame, eye_pts):
     """
     Create a mask over the eye region defined by eye_pts and then count
     the fraction of red-dominant pixels as a proxy for redness.
     """
-    mask = np.zeros(frame.shape[:2], dtype=np.uint8)
-    for pt in eye_pts:
-        cv2.circle(mask, pt, 2, 255, -1)
-    eye_area = cv2.bitwise_and(frame, frame, mask=mask)
-    r, g, b = cv2.split(eye_area)
-    red_pixels = np.sum(r > 150)
-    total_pixels = np.sum(mask > 0) + 1  # Avoid division by zero
-    red_ratio = red_pixels / total_pixels
-    return red_ratio
+    return _default_engine.measure(frame, eye_pts)
+
+
+class RednessEngine:
+    """
+    Redness measured only inside the bounding box of the eye points.
+
+    The mask and threshold buffers are flat arrays that only ever grow and are
+    reshaped to the current ROI, so steady-state calls allocate nothing the
+    size of the frame. Not thread-safe: use one engine per thread.
+
+    Parameters:
+        mode (str): "points" reproduces calc_redness (small discs around each
+            landmark); "polygon" fills the whole eye outline as a sclera mask
+        radius (int): Disc radius for "points" mode
+        level (int): Pixel value above which a pixel counts as red
+        channel (int): Frame channel to threshold
+    """
+
+    def __init__(self, mode="points", radius=2, level=REDNESS_LEVEL, channel=REDNESS_CHANNEL):
+        if mode not in ("points", "polygon"):
+            raise ValueError(f"Unknown redness mode: {mode}")
+        self.mode = mode
+        self.radius = radius
+        self.level = level
+        self.channel = channel
+        self._mask_buf = np.zeros(0, dtype=np.uint8)
+        self._hot_buf = np.zeros(0, dtype=bool)
+
+    def _buffers(self, h, w):
+        if self._mask_buf.size < h * w:
+            self._mask_buf = np.zeros(h * w, dtype=np.uint8)
+            self._hot_buf = np.zeros(h * w, dtype=bool)
+        return self._mask_buf[:h * w].reshape(h, w), self._hot_buf[:h * w].reshape(h, w)
+
+    def measure(self, frame, eye_pts):
+        """Red pixel ratio for one eye given its (K, 2) integer pixel points."""
+        pts = np.asarray(eye_pts, dtype=np.int32).reshape(-1, 2)
+        img_h, img_w = frame.shape[:2]
+        pad = self.radius if self.mode == "points" else 0
+        x0, y0 = np.maximum(pts.min(axis=0) - pad, 0)
+        x1, y1 = np.minimum(pts.max(axis=0) + pad + 1, (img_w, img_h))
+        if x1 <= x0 or y1 <= y0:
+            return 0.0
+
+        mask, hot = self._buffers(y1 - y0, x1 - x0)
+        mask[:] = 0
+        local = pts - (x0, y0)
+        if self.mode == "points":
+            for x, y in local.tolist():
+                cv2.circle(mask, (x, y), self.radius, 1, -1)
+        else:
+            cv2.fillPoly(mask, [local], 1)
+
+        np.greater(frame[y0:y1, x0:x1, self.channel], self.level, out=hot)
+        np.logical_and(hot, mask, out=hot)
+        total_pixels = np.count_nonzero(mask) + 1  # Avoid division by zero
+        return np.count_nonzero(hot) / total_pixels
+
+    def measure_eyes(self, frame, pts, eyes=BOTH_EYES):
+        """
+        Redness for several eyes from one landmark array in a single call.
+
+        Parameters:
+            frame (np.ndarray): BGR frame
+            pts (np.ndarray): (478, 2) pixel-space landmark array
+            eyes: Landmark index lists, left then right by default
+
+        Returns:
+            list: one ratio per eye
+        """
+        return [self.measure(frame, pts[eye_indices]) for eye_indices in eyes]
+
+
+_default_engine = RednessEngine()
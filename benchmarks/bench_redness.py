@@ -0,0 +1,68 @@
+"""
+Per-call cost of the redness measurement at 640x480 and 1280x720.
+
+Compares the original full-frame implementation (mask, bitwise_and and split
+over the whole frame) against the ROI-local RednessEngine.
+
+Usage:
+    python benchmarks/bench_redness.py [--repeat 2000]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+import cv2
+import numpy as np
+
+# The app modules import each other as top-level packages (vision.*, utils.*)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app"))
+
+from vision.landmarks import LEFT_EYE
+from vision.redness_detection import RednessEngine
+
+from fixtures import synthetic_landmarks
+
+RESOLUTIONS = [(640, 480), (1280, 720)]
+
+
+def calc_redness_full_frame(frame, eye_pts):
+    # The implementation calc_redness replaced, kept here as the baseline
+    mask = np.zeros(frame.shape[:2], dtype=np.uint8)
+    for pt in eye_pts:
+        cv2.circle(mask, pt, 2, 255, -1)
+    eye_area = cv2.bitwise_and(frame, frame, mask=mask)
+    r, g, b = cv2.split(eye_area)
+    red_pixels = np.sum(r > 150)
+    total_pixels = np.sum(mask > 0) + 1
+    return red_pixels / total_pixels
+
+
+def bench(func, repeat):
+    return min(timeit.repeat(func, number=repeat, repeat=3)) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    points_engine = RednessEngine()
+    polygon_engine = RednessEngine(mode="polygon")
+
+    print(f"{'resolution':>10}  {'full-frame':>11}  {'roi points':>11}  {'roi polygon':>11}  {'both eyes':>11}")
+    for img_w, img_h in RESOLUTIONS:
+        frame = rng.integers(0, 256, (img_h, img_w, 3), dtype=np.uint8)
+        pts = synthetic_landmarks(img_w, img_h, rng)
+        left = [tuple(p) for p in pts[LEFT_EYE].astype(np.int32).tolist()]
+
+        full = bench(lambda: calc_redness_full_frame(frame, left), args.repeat)
+        roi = bench(lambda: points_engine.measure(frame, left), args.repeat)
+        poly = bench(lambda: polygon_engine.measure(frame, left), args.repeat)
+        both = bench(lambda: points_engine.measure_eyes(frame, pts), args.repeat)
+        print(f"{img_w}x{img_h:<6}  {full:9.1f}us  {roi:9.1f}us  {poly:9.1f}us  {both:9.1f}us")
+
+
+if __name__ == "__main__":
+    main()
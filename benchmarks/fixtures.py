@@ -0,0 +1,57 @@
+"""
+Camera-free inputs for the benchmarks: synthetic frames, a synthetic face
+landmark array, a landmark sequence with blinks, and Mediapipe-style
+landmark objects for the object-based APIs.
+"""
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from vision.landmarks import LEFT_EYE, RIGHT_EYE, LEFT_IRIS, RIGHT_IRIS, NUM_LANDMARKS
+
+# Eye landmark offsets in units of half an eye width, in LEFT_EYE/RIGHT_EYE order
+EYE_OFFSETS = np.array([(-1, 0), (-0.5, -0.35), (0.5, -0.35), (1, 0), (0.5, 0.35), (-0.5, 0.35)])
+IRIS_OFFSETS = np.array([(0, 0), (0.25, 0), (0, -0.25), (-0.25, 0), (0, 0.25)])
+
+
+def synthetic_frame(img_w, img_h, rng):
+    """Noisy BGR frame with a skin-toned face disc, so thresholds see realistic values."""
+    frame = rng.integers(0, 256, (img_h, img_w, 3), dtype=np.uint8)
+    cv2.circle(frame, (img_w // 2, img_h // 2), min(img_w, img_h) // 3, (120, 150, 200), -1)
+    return frame
+
+
+def synthetic_landmarks(img_w, img_h, rng, openness=1.0):
+    """
+    (478, 2) pixel-space landmarks with both eyes placed where a face fills
+    the frame; `openness` scales the eyelid opening (0 = closed).
+    """
+    pts = (0.3 + 0.4 * rng.random((NUM_LANDMARKS, 2), dtype=np.float32)) * (img_w, img_h)
+    half_eye = img_w * 0.04
+    for eye, iris, cx in ((LEFT_EYE, LEFT_IRIS, img_w * 0.38), (RIGHT_EYE, RIGHT_IRIS, img_w * 0.62)):
+        center = np.array([cx, img_h * 0.42])
+        offsets = EYE_OFFSETS * (1, openness)
+        pts[eye] = center + offsets * half_eye
+        pts[iris] = center + IRIS_OFFSETS * half_eye
+    return pts.astype(np.float32)
+
+
+def landmark_sequence(n_frames, img_w=640, img_h=480, fps=30, blink_every=3.0, seed=0):
+    """
+    (n_frames, 478, 2) landmarks with a 5-frame blink every `blink_every`
+    seconds, plus the matching timestamps in seconds.
+    """
+    rng = np.random.default_rng(seed)
+    base = synthetic_landmarks(img_w, img_h, rng)
+    closed = synthetic_landmarks(img_w, img_h, np.random.default_rng(seed), openness=0.1)
+    timestamps = np.arange(n_frames, dtype=np.float64) / fps
+    blinking = (timestamps % blink_every) < 5 / fps
+    seq = np.where(blinking[:, None, None], closed, base)
+    jitter = rng.normal(0, 0.3, seq.shape).astype(np.float32)
+    return seq + jitter, timestamps
+
+
+def as_landmark_objects(pts, img_w, img_h):
+    """Normalized Mediapipe-style landmark objects (.x/.y/.z) for the object-based APIs."""
+    return [SimpleNamespace(x=float(x) / img_w, y=float(y) / img_h, z=0.0) for x, y in pts]
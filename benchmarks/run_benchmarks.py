@@ -0,0 +1,384 @@
+"""
+Camera-free benchmark suite for every stage of the eye-health pipeline.
+
+Times each stage on synthetic frames and landmark fixtures at several
+resolutions and writes the results as JSON, so runs can be compared over
+time and regressions caught before deploying to the glasses.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --only redness --resolutions 640x480
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/previous.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+# The app modules import each other as top-level packages (vision.*, utils.*)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "app"))
+
+from vision.blink_detection import BlinkDetector
+from vision.health_score import compute_eye_health_score
+from vision.landmarks import LEFT_EYE, RIGHT_EYE, LEFT_IRIS, EYE_AND_IRIS, landmarks_to_array, eye_aspect_ratios, to_normalized
+from vision.pupil_dilation import calculate_pupil_diameter, calculate_pupil_diameter_array
+from vision.redness_detection import calc_redness, RednessEngine
+from utils.logging_helpers import log_data, SessionLogger
+from utils.overlay import draw_landmarks, draw_text_panel, TextPanelLayer
+from utils.snapshot_helpers import crop_and_save_eye_snapshot
+from utils.timeseries import TimeSeriesStore
+
+from fixtures import synthetic_frame, synthetic_landmarks, landmark_sequence, as_landmark_objects
+
+DEFAULT_RESOLUTIONS = "320x240,640x480,1280x720"
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+BENCHMARKS = []
+
+
+class Skip(Exception):
+    """Raised by a benchmark setup when its dependency is unavailable."""
+
+
+def benchmark(name, per_resolution=True):
+    """
+    Register a setup function. It receives a context dict (img_w, img_h,
+    frame, pts, landmarks, rng, tmpdir) and returns the callable to time.
+    """
+    def register(setup):
+        BENCHMARKS.append((name, per_resolution, setup))
+        return setup
+    return register
+
+
+def _euclidean(p1, p2):
+    return ((p1.x - p2.x)**2 + (p1.y - p2.y)**2)**0.5
+
+
+# ========== Benchmarks ==========
+@benchmark("landmarks_to_array")
+def _(ctx):
+    return lambda: landmarks_to_array(ctx["landmarks"], ctx["img_w"], ctx["img_h"])
+
+
+@benchmark("landmarks_to_array_eyes")
+def _(ctx):
+    return lambda: landmarks_to_array(ctx["landmarks"], ctx["img_w"], ctx["img_h"], indices=EYE_AND_IRIS)
+
+
+@benchmark("frame_eye_metrics_objects", per_resolution=False)
+def _(ctx):
+    # Baseline: the original per-frame EAR and pupil size, point by point on the landmark objects
+    landmarks = ctx["landmarks"]
+
+    def ear(eye):
+        top = (_euclidean(landmarks[eye[1]], landmarks[eye[5]]) +
+               _euclidean(landmarks[eye[2]], landmarks[eye[4]]))
+        hor = _euclidean(landmarks[eye[0]], landmarks[eye[3]])
+        return (top / 2) / hor if hor != 0 else 0
+    return lambda: (ear(LEFT_EYE), ear(RIGHT_EYE), calculate_pupil_diameter(landmarks, LEFT_IRIS, _euclidean))
+
+
+@benchmark("frame_eye_metrics_array", per_resolution=False)
+def _(ctx):
+    # Same per-frame work through a landmark array of just the eye points, conversion included
+    landmarks = ctx["landmarks"]
+
+    def run():
+        pts = landmarks_to_array(landmarks, indices=EYE_AND_IRIS)
+        return eye_aspect_ratios(pts), calculate_pupil_diameter_array(pts, LEFT_IRIS)
+    return run
+
+
+@benchmark("facemesh_process")
+def _(ctx):
+    try:
+        import mediapipe as mp
+    except ImportError:
+        raise Skip("mediapipe not installed")
+    face_mesh = mp.solutions.face_mesh.FaceMesh(max_num_faces=1, refine_landmarks=True)
+    rgb = cv2.cvtColor(ctx["frame"], cv2.COLOR_BGR2RGB)
+    return lambda: face_mesh.process(rgb)
+
+
+@benchmark("calculate_ear", per_resolution=False)
+def _(ctx):
+    detector = BlinkDetector()
+    landmarks = ctx["landmarks"]
+    return lambda: (detector.calculate_ear(landmarks, LEFT_EYE), detector.calculate_ear(landmarks, RIGHT_EYE))
+
+
+@benchmark("eye_aspect_ratios_array", per_resolution=False)
+def _(ctx):
+    norm_pts = to_normalized(ctx["pts"], ctx["img_w"], ctx["img_h"])
+    return lambda: eye_aspect_ratios(norm_pts)
+
+
+@benchmark("calc_redness")
+def _(ctx):
+    left = [tuple(p) for p in ctx["pts"][LEFT_EYE].astype(np.int32).tolist()]
+    return lambda: calc_redness(ctx["frame"], left)
+
+
+@benchmark("redness_engine_polygon_both_eyes")
+def _(ctx):
+    engine = RednessEngine(mode="polygon")
+    return lambda: engine.measure_eyes(ctx["frame"], ctx["pts"])
+
+
+@benchmark("calculate_pupil_diameter", per_resolution=False)
+def _(ctx):
+    return lambda: calculate_pupil_diameter(ctx["landmarks"], LEFT_IRIS, _euclidean)
+
+
+@benchmark("calculate_pupil_diameter_array", per_resolution=False)
+def _(ctx):
+    return lambda: calculate_pupil_diameter_array(ctx["pts"], LEFT_IRIS)
+
+
+@benchmark("compute_eye_health_score", per_resolution=False)
+def _(ctx):
+    now = time.time()
+    blink_log = [now - i for i in range(300)]
+    return lambda: compute_eye_health_score(12, 0.06, blink_log, 120)
+
+
+@benchmark("blink_detector_update", per_resolution=False)
+def _(ctx):
+    seq, timestamps = landmark_sequence(900)
+    ears = eye_aspect_ratios(seq / (640, 480)).mean(axis=1)
+    detector = BlinkDetector(clock=lambda: 0.0)
+    state = {"i": 0}
+
+    def step():
+        # Loop the 30 s fixture on a continuously increasing clock
+        lap, i = divmod(state["i"], len(ears))
+        t = float(timestamps[i]) + 30.0 * lap
+        detector.update(ears[i], timestamp=t)
+        detector.get_blink_counts(t)
+        state["i"] += 1
+    return step
+
+
+@benchmark("crop_and_save_eye_snapshot")
+def _(ctx):
+    out_dir = os.path.join(ctx["tmpdir"], "snapshots")
+    return lambda: crop_and_save_eye_snapshot(ctx["frame"], ctx["pts"], LEFT_EYE + RIGHT_EYE, out_dir, "bench_")
+
+
+LOG_ROW = {"time_min": 1.0, "blink_rate": 12, "redness": 0.01, "pupil_diameter": 0.014,
+           "health_score": 91.5, "strain_level": "Low"}
+
+
+@benchmark("log_data", per_resolution=False)
+def _(ctx):
+    filename = os.path.join(ctx["tmpdir"], "log_data.csv")
+    return lambda: log_data(filename, LOG_ROW)
+
+
+@benchmark("session_logger_log", per_resolution=False)
+def _(ctx):
+    logger = SessionLogger(os.path.join(ctx["tmpdir"], "session_logger.csv"))
+    ctx["cleanup"].append(logger.close)
+    return lambda: logger.log(LOG_ROW)
+
+
+@benchmark("timeseries_store_add", per_resolution=False)
+def _(ctx):
+    store = TimeSeriesStore()
+    values = {"avg_ear": 0.31, "blink_rate": 14, "redness": 0.01, "pupil_diameter": 0.014, "health_score": 92}
+    state = {"t": 0.0}
+
+    def add():
+        # 30 fps clock, so every tier keeps opening and closing buckets
+        store.add(state["t"], values)
+        state["t"] += 1 / 30
+    return add
+
+
+PANEL_VALUES = {"blinks": 42, "blink_rate": 14.0, "redness_label": "NORMAL", "pupil_diameter": 0.014,
+                "strain_level": "Low", "health_score": 92, "avg_ear": 0.31, "user_name": "bench"}
+
+
+@benchmark("overlay_drawing")
+def _(ctx):
+    frame = ctx["frame"].copy()
+
+    def draw():
+        draw_landmarks(frame, ctx["pts"])
+        draw_text_panel(frame, PANEL_VALUES)
+    return draw
+
+
+@benchmark("overlay_text_panel_cached")
+def _(ctx):
+    frame = ctx["frame"].copy()
+    panel = TextPanelLayer()
+    values = dict(PANEL_VALUES)
+    state = {"i": 0}
+
+    def draw():
+        # EAR changes every frame like in the live loop; the other lines stay cached
+        values["avg_ear"] = 0.25 + (state["i"] % 50) * 0.002
+        panel.draw(frame, values)
+        state["i"] += 1
+    return draw
+
+
+def _lbph():
+    if not hasattr(cv2, "face"):
+        raise Skip("opencv-contrib (cv2.face) not installed")
+    return cv2.face.LBPHFaceRecognizer_create()
+
+
+@benchmark("lbph_predict", per_resolution=False)
+def _(ctx):
+    recognizer = _lbph()
+    samples = [ctx["rng"].integers(0, 256, (200, 200), dtype=np.uint8) for _ in range(20)]
+    recognizer.train(samples, np.arange(20) % 2)
+    return lambda: recognizer.predict(samples[0])
+
+
+@benchmark("lbph_train_20", per_resolution=False)
+def _(ctx):
+    _lbph()
+    samples = [ctx["rng"].integers(0, 256, (200, 200), dtype=np.uint8) for _ in range(20)]
+    labels = np.arange(20) % 2
+    return lambda: cv2.face.LBPHFaceRecognizer_create().train(samples, labels)
+
+
+# ========== Runner ==========
+def time_calls(func, calls, max_seconds):
+    func()  # warm-up: first calls pay for allocations and lazy init
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for _ in range(calls):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+        if time.perf_counter() > deadline:
+            break
+    samples = np.array(samples) * 1e6
+    return {
+        "calls": len(samples),
+        "mean_us": float(samples.mean()),
+        "p50_us": float(np.percentile(samples, 50)),
+        "p95_us": float(np.percentile(samples, 95)),
+        "min_us": float(samples.min()),
+        "ops_per_s": float(1e6 / samples.mean()),
+    }
+
+
+def parse_resolutions(text):
+    return [tuple(int(v) for v in res.split("x")) for res in text.split(",")]
+
+
+def run(resolutions, calls, max_seconds, only=None):
+    results = []
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, per_resolution, setup in BENCHMARKS:
+            if only and only not in name:
+                continue
+            for img_w, img_h in (resolutions if per_resolution else resolutions[:1]):
+                pts = synthetic_landmarks(img_w, img_h, rng)
+                ctx = {
+                    "img_w": img_w, "img_h": img_h, "rng": rng, "tmpdir": tmpdir, "cleanup": [],
+                    "frame": synthetic_frame(img_w, img_h, rng), "pts": pts,
+                    "landmarks": as_landmark_objects(pts, img_w, img_h),
+                }
+                entry = {"name": name, "resolution": f"{img_w}x{img_h}" if per_resolution else None}
+                try:
+                    entry.update(time_calls(setup(ctx), calls, max_seconds))
+                except Skip as e:
+                    entry["skipped"] = str(e)
+                finally:
+                    for cleanup in ctx["cleanup"]:
+                        cleanup()
+                results.append(entry)
+                print(format_result(entry))
+    return results
+
+
+def result_label(entry):
+    return entry["name"] + (f" @ {entry['resolution']}" if entry["resolution"] else "")
+
+
+def format_result(entry):
+    label = result_label(entry)
+    if "skipped" in entry:
+        return f"{label:<48} skipped ({entry['skipped']})"
+    return f"{label:<48} p50 {entry['p50_us']:10.1f}us  p95 {entry['p95_us']:10.1f}us  {entry['ops_per_s']:10.0f}/s"
+
+
+def metadata():
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+    }
+
+
+def compare(results, baseline_path, tolerance):
+    """
+    Print p50 ratios against a previous run.
+
+    Returns:
+        list: names of benchmarks that got slower by more than `tolerance`
+    """
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["resolution"]): r for r in json.load(f)["results"] if "p50_us" in r}
+    regressions = []
+    print(f"\nCompared with {baseline_path}:")
+    for entry in results:
+        old = baseline.get((entry["name"], entry["resolution"]))
+        if old is None or "p50_us" not in entry:
+            continue
+        ratio = entry["p50_us"] / old["p50_us"]
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  <-- regression"
+            regressions.append(result_label(entry))
+        print(f"{result_label(entry):<48} x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Camera-free benchmarks for the eye-health pipeline.")
+    parser.add_argument("--resolutions", default=DEFAULT_RESOLUTIONS, help="Comma-separated WxH list")
+    parser.add_argument("--calls", type=int, default=200, help="Timed calls per benchmark")
+    parser.add_argument("--max-seconds", type=float, default=2.0, help="Time cap per benchmark")
+    parser.add_argument("--only", help="Run only benchmarks whose name contains this text")
+    parser.add_argument("--output", help="JSON output path (default: benchmarks/results/bench_<time>.json)")
+    parser.add_argument("--compare", help="Previous JSON result to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown before flagging")
+    args = parser.parse_args()
+
+    results = run(parse_resolutions(args.resolutions), args.calls, args.max_seconds, args.only)
+
+    output = args.output or os.path.join(RESULTS_DIR, datetime.now().strftime("bench_%Y-%m-%d_%H-%M-%S.json"))
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump({"meta": metadata(), "results": results}, f, indent=2)
+    print(f"\n📄 Results written to {output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) over {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()